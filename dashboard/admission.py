@@ -0,0 +1,120 @@
+"""
+Admission control for the CPU-heavy image compression stage.
+
+Every upload runs several WebP encodes on the same process that serves the
+public site. The gate below caps how many encodes run at once, how many
+uploads may wait for a slot, and how long they wait, so a burst of editor
+uploads can't starve page rendering.
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the compression stage is saturated"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CompressionGate:
+    """Process-wide semaphore with a bounded wait queue and wait-time stats"""
+
+    def __init__(self, concurrency, queue_depth, timeout):
+        self.concurrency = max(1, int(concurrency))
+        self.queue_depth = max(0, int(queue_depth))
+        self.timeout = max(0.0, float(timeout))
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        # Metrics (guarded by _lock)
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying"""
+        return max(1, math.ceil(self.timeout))
+
+    def _reject(self, message):
+        with self._lock:
+            self._rejected += 1
+        logger.warning('Image compression rejected: %s', message)
+        raise AdmissionRejected(message, self.retry_after)
+
+    @contextmanager
+    def slot(self, blocking=False):
+        """
+        Hold a compression slot for the duration of the block.
+        Yields the time (seconds) spent waiting for the slot.
+
+        With blocking=True the queue depth and timeout are ignored - used by
+        background work that must eventually run but must not jump the queue.
+        """
+        start = time.monotonic()
+        if blocking:
+            self._slots.acquire()
+        elif not self._slots.acquire(blocking=False):
+            with self._lock:
+                queue_full = self._waiting >= self.queue_depth
+                if not queue_full:
+                    self._waiting += 1
+            if queue_full:
+                self._reject('queue full')
+            try:
+                acquired = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if not acquired:
+                self._reject('timed out waiting for a slot')
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._active += 1
+            self._admitted += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            yield waited
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def stats(self):
+        """Snapshot of gate metrics"""
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'queue_depth': self.queue_depth,
+                'timeout': self.timeout,
+                'active': self._active,
+                'waiting': self._waiting,
+                'admitted': self._admitted,
+                'rejected': self._rejected,
+                'queue_wait_avg_ms': round(self._wait_total / self._admitted * 1000, 1) if self._admitted else 0.0,
+                'queue_wait_max_ms': round(self._wait_max * 1000, 1),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_compression_gate():
+    """Return the process-wide compression gate configured from settings"""
+    return CompressionGate(
+        concurrency=getattr(settings, 'IMAGE_COMPRESSION_CONCURRENCY', 2),
+        queue_depth=getattr(settings, 'IMAGE_COMPRESSION_QUEUE_DEPTH', 4),
+        timeout=getattr(settings, 'IMAGE_COMPRESSION_QUEUE_TIMEOUT', 10),
+    )
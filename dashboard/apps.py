@@ -5,4 +5,18 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
 
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from myApp.models import MediaAsset, Section
+        from .gallery import invalidate_gallery_cache
+        from .search import index_saved_asset, remove_deleted_asset
+        from .transport import install_pooled_transport
 
+        install_pooled_transport()
+        post_save.connect(invalidate_gallery_cache, sender=MediaAsset, dispatch_uid='gallery-cache-save')
+        post_delete.connect(invalidate_gallery_cache, sender=MediaAsset, dispatch_uid='gallery-cache-delete')
+        # Usage counts shown in the gallery change with section configs
+        post_save.connect(invalidate_gallery_cache, sender=Section, dispatch_uid='gallery-cache-section-save')
+        post_delete.connect(invalidate_gallery_cache, sender=Section, dispatch_uid='gallery-cache-section-delete')
+        post_save.connect(index_saved_asset, sender=MediaAsset, dispatch_uid='media-search-save')
+        post_delete.connect(remove_deleted_asset, sender=MediaAsset, dispatch_uid='media-search-delete')
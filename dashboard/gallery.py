@@ -0,0 +1,163 @@
+"""
+Keyset pagination and per-cursor caching for the media gallery API.
+
+Pages are ordered by (created_at, id) descending and continue from an opaque
+cursor encoding the last row of the previous page, so every page is one
+indexed range scan no matter how deep it is. Cached pages are keyed by a
+version number that is bumped whenever a MediaAsset changes; it is stored in
+the database (CacheVersion) so bumps from management commands and other
+workers reach every process.
+"""
+import base64
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from myApp.models import CacheVersion, MediaAsset, MediaAssetTag, MediaTag, MediaUsage
+
+VERSION_KEY = 'gallery'  # CacheVersion name
+
+# Columns the gallery needs - nothing else is loaded
+GALLERY_FIELDS = (
+    'id', 'web_url', 'thumb_url', 'secure_url', 'public_id', 'format', 'bytes_size',
+    'width', 'height', 'title', 'placeholder', 'dominant_color', 'aspect_ratio', 'created_at',
+)
+
+
+def encode_cursor(created_at, pk) -> str:
+    """Opaque cursor pointing just past (created_at, pk)"""
+    raw = f'{created_at.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def gallery_cache_version() -> int:
+    """Current gallery cache version (cached pages from older versions are ignored)"""
+    return CacheVersion.current(VERSION_KEY)
+
+
+def invalidate_gallery_cache(**kwargs):
+    """Bump the gallery cache version. Also connected to MediaAsset save/delete signals."""
+    CacheVersion.bump(VERSION_KEY)
+
+
+def save_asset_tags(asset_tags):
+    """
+    Link assets to tags in bulk: {asset_id: [raw tag names]}.
+    Three queries regardless of how many assets/tags; existing links are kept.
+    """
+    asset_tags = {asset_id: MediaTag.normalize(names) for asset_id, names in asset_tags.items()}
+    names = {name for tag_names in asset_tags.values() for name in tag_names}
+    if not names:
+        return
+
+    MediaTag.objects.bulk_create([MediaTag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(MediaTag.objects.filter(name__in=names).values_list('name', 'id'))
+    MediaAssetTag.objects.bulk_create(
+        [
+            MediaAssetTag(asset_id=asset_id, tag_id=tag_ids[name])
+            for asset_id, tag_names in asset_tags.items()
+            for name in tag_names
+        ],
+        ignore_conflicts=True,
+    )
+    invalidate_gallery_cache()
+
+    from .search import index_assets  # search imports this module
+    index_assets(asset_tags)
+
+
+def filter_by_tags(qs, tags, mode='all'):
+    """
+    Restrict an asset queryset to the given tags, as one subquery.
+    mode='all': assets carrying every tag; mode='any': assets carrying at least one.
+    """
+    tags = MediaTag.normalize(tags)
+    if not tags:
+        return qs
+
+    links = MediaAssetTag.objects.filter(tag__name__in=tags)
+    if mode == 'any':
+        return qs.filter(id__in=links.values('asset_id'))
+    matching = links.values('asset_id').annotate(n=Count('tag_id')).filter(n=len(tags)).values('asset_id')
+    return qs.filter(id__in=matching)
+
+
+def serialize_gallery_rows(rows):
+    """Gallery JSON for GALLERY_FIELDS rows, with each asset's tags and usage count fetched in one query each"""
+    ids = [row['id'] for row in rows]
+    row_tags = {}
+    for asset_id, name in MediaAssetTag.objects.filter(asset_id__in=ids).values_list('asset_id', 'tag__name'):
+        row_tags.setdefault(asset_id, []).append(name)
+    usage_counts = dict(
+        MediaUsage.objects.filter(asset_id__in=ids).values('asset_id')
+        .annotate(n=Count('section_id', distinct=True)).values_list('asset_id', 'n')
+    )
+
+    return [{
+        'id': row['id'],
+        'url': row['web_url'],  # Use optimized web_url
+        'thumbnail': row['thumb_url'],  # Use thumbnail URL
+        'secure_url': row['secure_url'],
+        'public_id': row['public_id'],
+        'format': row['format'],
+        'bytes': row['bytes_size'],
+        'width': row['width'],
+        'height': row['height'],
+        'title': row['title'],
+        'placeholder': row['placeholder'],
+        'dominant_color': row['dominant_color'],
+        'aspect_ratio': row['aspect_ratio'],
+        'tags': sorted(row_tags.get(row['id'], [])),
+        'usage_count': usage_counts.get(row['id'], 0),  # Sections referencing the asset
+    } for row in rows]
+
+
+def gallery_page(cursor=None, page_size=None, tags=None, tag_mode='all', version=None):
+    """
+    One page of active assets, newest first, optionally filtered by tags (tag_mode 'all' or 'any').
+    Returns {'images': [...], 'next_cursor': str|None}; cached per version, filter, cursor and page size.
+    Pass version when the caller already read gallery_cache_version() (saves a query).
+    """
+    page_size = page_size or getattr(settings, 'GALLERY_PAGE_SIZE', 48)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+    tags = MediaTag.normalize(tags or [])
+    if tag_mode not in ('all', 'any'):
+        raise ValueError('tag_mode must be "all" or "any"')
+
+    tag_key = hashlib.sha1(','.join(sorted(tags)).encode()).hexdigest()[:16] if tags else ''
+    cache_key = f'gallery:page:{version or gallery_cache_version()}:{tag_mode}:{tag_key}:{cursor or ""}:{page_size}'
+    page = cache.get(cache_key)
+    if page is not None:
+        return page
+
+    qs = filter_by_tags(MediaAsset.objects.filter(is_active=True), tags, tag_mode)
+    if cursor:
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    # One extra row tells us whether another page exists
+    rows = list(qs.order_by('-created_at', '-id').values(*GALLERY_FIELDS)[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+    page = {
+        'images': serialize_gallery_rows(rows),
+        'next_cursor': next_cursor,
+    }
+    cache.set(cache_key, page, getattr(settings, 'GALLERY_CACHE_TIMEOUT', 300))
+    return page
@@ -0,0 +1,150 @@
+"""
+Image fingerprinting, placeholder and perceptual-quality helpers for the media pipeline.
+"""
+import base64
+import hashlib
+import io
+
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageFilter, ImageOps
+
+HASH_CHUNK_SIZE = 64 * 1024
+PLACEHOLDER_WIDTH = 16  # LQIP width in pixels - scaled up and blurred by the browser
+# 8x8 dHashes of images with no left-to-right structure (solid colours, gradients)
+FEATURELESS_HASHES = frozenset({'0' * 16, 'f' * 16})
+
+
+def check_decode_budget(im):
+    """
+    Refuse to decode images whose pixel buffer would exceed IMAGE_MAX_DECODE_PIXELS.
+    Call after Image.open()/draft() and before anything that loads pixel data.
+    """
+    max_pixels = getattr(settings, 'IMAGE_MAX_DECODE_PIXELS', 50_000_000)
+    if im.width * im.height > max_pixels:
+        raise ValueError(
+            f'Image dimensions {im.width}x{im.height} are too large to process '
+            f'(limit is {max_pixels / 1_000_000:.0f} megapixels).'
+        )
+
+
+def content_sha256(src_file) -> str:
+    """SHA-256 hex digest of the raw upload bytes, read in chunks"""
+    digest = hashlib.sha256()
+    if hasattr(src_file, 'chunks'):
+        for chunk in src_file.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    else:
+        src_file.seek(0)
+        for chunk in iter(lambda: src_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    src_file.seek(0)
+    return digest.hexdigest()
+
+
+def perceptual_hash(src_file, hash_size=8) -> str:
+    """
+    Difference hash (dHash) of the decoded image as a hex string.
+    Visually identical images (re-saved, re-compressed, stripped metadata)
+    produce the same hash even though their bytes differ - but so do the same
+    picture at another resolution or in other colours, and any image without
+    horizontal detail (flat colours, plain gradients). Only good for hints.
+    """
+    src_file.seek(0)
+    im = Image.open(src_file)
+    # Let JPEG decode at reduced scale - we only need a tiny thumbnail
+    im.draft('L', (hash_size * 8, hash_size * 8))
+    check_decode_budget(im)
+    try:
+        im = ImageOps.exif_transpose(im)
+    except Exception:
+        pass
+    im = im.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(im.getdata())
+    src_file.seek(0)
+
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f'{bits:0{hash_size * hash_size // 4}x}'
+
+
+def placeholder_metadata(src_file) -> dict:
+    """
+    Low-quality image placeholder (LQIP) data for instant rendering:
+    - placeholder: tiny blurred WebP as a data URI (a few hundred bytes)
+    - dominant_color: most common colour as #rrggbb
+    - aspect_ratio: width / height after EXIF rotation
+    """
+    src_file.seek(0)
+    im = Image.open(src_file)
+    im.draft('RGB', (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+    check_decode_budget(im)
+    try:
+        im = ImageOps.exif_transpose(im)
+    except Exception:
+        pass
+    if im.mode in ('RGBA', 'LA', 'P'):
+        im = im.convert('RGBA')
+        background = Image.new('RGB', im.size, (255, 255, 255))
+        background.paste(im, mask=im.split()[-1])
+        im = background
+    elif im.mode != 'RGB':
+        im = im.convert('RGB')
+    src_file.seek(0)
+
+    aspect_ratio = im.width / im.height if im.height else 0
+    height = max(1, round(PLACEHOLDER_WIDTH / aspect_ratio)) if aspect_ratio else PLACEHOLDER_WIDTH
+    tiny = im.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    tiny.filter(ImageFilter.GaussianBlur(1)).save(buf, format='WEBP', quality=40)
+    placeholder = 'data:image/webp;base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+
+    # Dominant colour: most populous bucket of a 5-colour palette
+    palette_im = tiny.quantize(colors=5)
+    palette = palette_im.getpalette()
+    _, index = max(palette_im.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+
+    return {
+        'placeholder': placeholder,
+        'dominant_color': f'#{r:02x}{g:02x}{b:02x}',
+        'aspect_ratio': round(aspect_ratio, 4),
+    }
+
+
+def luminance_array(im, max_side=512):
+    """Luminance channel as a float64 array, downsampled so the longest side is at most max_side"""
+    im = im.convert('L')
+    scale = max_side / max(im.size)
+    if scale < 1:
+        im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))), Image.BOX)
+    return np.asarray(im, dtype=np.float64)
+
+
+def _box_mean(x, win):
+    """Mean over every win x win window (valid region) using an integral image"""
+    c = np.pad(x.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    return (c[win:, win:] - c[:-win, win:] - c[win:, :-win] + c[:-win, :-win]) / (win * win)
+
+
+def ssim(a, b, win=7):
+    """
+    Mean structural similarity of two equally sized luminance arrays (1.0 = identical).
+    Uses a uniform window, computed fully vectorised.
+    """
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    win = max(1, min(win, *a.shape))
+
+    mu_a = _box_mean(a, win)
+    mu_b = _box_mean(b, win)
+    var_a = _box_mean(a * a, win) - mu_a ** 2
+    var_b = _box_mean(b * b, win) - mu_b ** 2
+    cov = _box_mean(a * b, win) - mu_a * mu_b
+
+    ssim_map = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim_map.mean())
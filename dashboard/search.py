@@ -0,0 +1,114 @@
+"""
+Full-text search over media titles, public_ids and tags.
+
+SQLite uses an FTS5 virtual table (rowid = MediaAsset.id) ranked with bm25;
+PostgreSQL uses a tsvector table with a GIN index ranked with ts_rank. Both
+are created by migration myApp 0011 and kept in sync from MediaAsset
+save/delete signals and the bulk tag/sync paths. Only active assets are
+indexed, so ranking and LIMIT never spend results on soft-deleted ones.
+Other databases fall back to a plain icontains filter.
+"""
+import re
+
+from django.db import connection
+
+from myApp.models import MediaAsset, MediaAssetTag
+from .gallery import GALLERY_FIELDS, serialize_gallery_rows
+
+SEARCH_TABLE = 'media_asset_search'
+
+# bm25 column weights: title, public_id, tags
+FTS5_WEIGHTS = (10.0, 2.0, 5.0)
+
+
+def _words(value):
+    """Split on anything that isn't a letter or digit, so 'uploads/IMG_0001' -> 'uploads img 0001'"""
+    return ' '.join(re.findall(r'[^\W_]+', value.lower()))
+
+
+def index_assets(asset_ids):
+    """(Re)build the search rows for the given assets - three queries plus one batched write. Inactive assets lose theirs."""
+    asset_ids = list(asset_ids)
+    if not asset_ids or connection.vendor not in ('sqlite', 'postgresql'):
+        return
+
+    tags = {}
+    for asset_id, name in MediaAssetTag.objects.filter(asset_id__in=asset_ids).values_list('asset_id', 'tag__name'):
+        tags.setdefault(asset_id, []).append(name)
+    docs = [
+        (pk, _words(title), _words(public_id), _words(' '.join(tags.get(pk, []))))
+        for pk, title, public_id in MediaAsset.objects.filter(id__in=asset_ids, is_active=True).values_list('id', 'title', 'public_id')
+    ]
+
+    remove_assets(asset_ids)
+    if not docs:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, public_id, tags) VALUES (%s, %s, %s, %s)',
+                docs,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (asset_id, document) VALUES ("
+                f"%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'C')"
+                f" || setweight(to_tsvector('simple', %s), 'B'))",
+                docs,
+            )
+
+
+def remove_assets(asset_ids):
+    """Drop the search rows for the given assets"""
+    asset_ids = list(asset_ids)
+    if not asset_ids or connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    placeholders = ', '.join(['%s'] * len(asset_ids))
+    key = 'rowid' if connection.vendor == 'sqlite' else 'asset_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})', asset_ids)
+
+
+def search_assets(query, limit=20):
+    """
+    Active assets matching every word of query as a prefix, best match first.
+    Returns gallery-format dicts.
+    """
+    words = _words(query).split()
+    if not words:
+        return []
+
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                    f'ORDER BY bm25({SEARCH_TABLE}, %s, %s, %s) LIMIT %s',
+                    [' '.join(f'"{w}"*' for w in words), *FTS5_WEIGHTS, limit],
+                )
+            else:
+                cursor.execute(
+                    f"SELECT asset_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) AS q "
+                    f"WHERE document @@ q ORDER BY ts_rank(document, q) DESC LIMIT %s",
+                    [' & '.join(f'{w}:*' for w in words), limit],
+                )
+            ranked_ids = [row[0] for row in cursor.fetchall()]
+        rows = {row['id']: row for row in MediaAsset.objects.filter(id__in=ranked_ids).values(*GALLERY_FIELDS)}
+        rows = [rows[pk] for pk in ranked_ids if pk in rows]
+    else:
+        qs = MediaAsset.objects.filter(is_active=True)
+        for word in words:
+            qs = qs.filter(title__icontains=word) | qs.filter(public_id__icontains=word)
+        rows = list(qs.order_by('-created_at').values(*GALLERY_FIELDS)[:limit])
+
+    return serialize_gallery_rows(rows)
+
+
+def index_saved_asset(sender, instance, **kwargs):
+    """post_save receiver for MediaAsset"""
+    index_assets([instance.pk])
+
+
+def remove_deleted_asset(sender, instance, **kwargs):
+    """post_delete receiver for MediaAsset"""
+    remove_assets([instance.pk])
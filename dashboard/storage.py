@@ -0,0 +1,404 @@
+"""
+Where uploaded media is stored and how its delivery URLs are built.
+
+The media pipeline talks to a storage backend instead of a specific service.
+MEDIA_STORAGE_BACKEND selects the implementation:
+- CloudinaryStorageBackend (default): uploads to Cloudinary, variants are URL transformations
+- LocalStorageBackend: writes under MEDIA_ROOT and generates the variants itself,
+  so uploads, the gallery and load tests run without any network access
+"""
+import logging
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+import cloudinary.api
+import cloudinary.exceptions
+import cloudinary.uploader
+import cloudinary.utils
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .imaging import content_sha256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FOLDER = 'insight-seeker/uploads'
+CLOUDINARY_URL_RE = re.compile(r'^https?://res\.cloudinary\.com/[^/]+/image/upload/(?P<path>[^?#]+)')
+# Delivery URL transformation parameters (https://cloudinary.com/documentation/transformation_reference).
+# A path segment is a transformation only if every comma-separated part is one of these key_value
+# pairs - otherwise folder names like my_pics/ would be taken for one.
+CLOUDINARY_TRANSFORMATION_KEYS = (
+    'a', 'ac', 'af', 'ar', 'b', 'bo', 'br', 'c', 'co', 'cs', 'd', 'dl', 'dn', 'dpr', 'du', 'e', 'eo',
+    'f', 'fl', 'fn', 'fps', 'g', 'h', 'if', 'ki', 'l', 'o', 'p', 'pg', 'q', 'r', 'so', 'sp', 't', 'u',
+    'vc', 'vs', 'w', 'x', 'y', 'z',
+)
+_TRANSFORMATION_PARAM = rf"(?:{'|'.join(CLOUDINARY_TRANSFORMATION_KEYS)})_[^,/]+"
+CLOUDINARY_TRANSFORMATION_RE = re.compile(rf'^{_TRANSFORMATION_PARAM}(?:,{_TRANSFORMATION_PARAM})*$')
+CLOUDINARY_VERSION_RE = re.compile(r'^v\d+$')
+WEB_MAX_WIDTH = 2400
+THUMB_SIZE = (480, 320)
+
+
+def split_cloudinary_path(path):
+    """
+    Split the part of a delivery URL after /image/upload/ into
+    (transformation segments, version segment or '', public_id segments).
+    A version segment (v1234) anchors the split; without one only leading
+    segments made entirely of known transformation parameters are taken.
+    """
+    segments = path.split('/')
+    for index, segment in enumerate(segments[:-1]):
+        if CLOUDINARY_VERSION_RE.match(segment):
+            if all(CLOUDINARY_TRANSFORMATION_RE.match(s) for s in segments[:index]):
+                return segments[:index], segment, segments[index + 1:]
+            break
+    transformations = []
+    while len(segments) > 1 and CLOUDINARY_TRANSFORMATION_RE.match(segments[0]):
+        transformations.append(segments.pop(0))
+    return transformations, '', segments
+
+
+class MediaStorageBackend:
+    """Interface shared by all media storage backends"""
+
+    def upload(self, file_obj, folder, public_id, tags=None, overwrite=True, invalidate=False):
+        """
+        Store file_obj as folder/public_id.
+        With overwrite=False an existing public_id is left untouched and the
+        result carries "existing": True instead. invalidate=True purges CDN
+        copies when overwriting.
+        Returns: (result_dict, web_url, thumb_url) where result_dict uses
+        Cloudinary's keys (public_id, secure_url, bytes, width, height, format).
+        """
+        raise NotImplementedError
+
+    def variant_urls(self, secure_url):
+        """Return (web_url, thumb_url) for a stored original"""
+        raise NotImplementedError
+
+    def public_id_from_url(self, url):
+        """public_id of a delivery URL for this backend (any variant), or None if it isn't one"""
+        raise NotImplementedError
+
+    def list_resources(self, prefix, max_results=100, next_cursor=None, since=None):
+        """
+        Return {'resources': [...], 'next_cursor': str|None} for stored images under prefix.
+        With since (aware datetime) only images created at or after it are listed,
+        oldest first; a page may then be empty while next_cursor is still set.
+        """
+        raise NotImplementedError
+
+    def delete(self, public_ids, invalidate=True):
+        """Delete the given public_ids. Returns {'deleted': {public_id: 'deleted'|'not_found'}}"""
+        raise NotImplementedError
+
+
+class CloudinaryStorageBackend(MediaStorageBackend):
+    """Media stored on Cloudinary; variants are delivery-URL transformations"""
+
+    def upload(self, file_obj, folder, public_id, tags=None, overwrite=True, invalidate=False):
+        options = {
+            'resource_type': "image",
+            'folder': folder or DEFAULT_FOLDER,
+            'public_id': public_id,
+            'overwrite': overwrite,
+            'invalidate': invalidate,
+            'unique_filename': False,
+            'use_filename': False,
+            'access_mode': "public",  # CRITICAL: Public access
+            'eager': [{
+                "format": "webp",
+                "quality": "auto",
+                "fetch_format": "auto",
+                "crop": "limit",
+                "width": WEB_MAX_WIDTH
+            }],
+            'tags': (tags or []),
+            # The eager variant is built after the upload returns and reported to the webhook
+            'eager_async': getattr(settings, 'CLOUDINARY_EAGER_ASYNC', True),
+        }
+        notification_url = getattr(settings, 'CLOUDINARY_EAGER_NOTIFICATION_URL', '')
+        if notification_url:
+            options['eager_notification_url'] = notification_url
+
+        file_obj.seek(0, os.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(0)
+        if size >= getattr(settings, 'CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD', 5 * 1024 * 1024):
+            result = self._upload_chunked(file_obj, size, options)
+        else:
+            # file_obj is handed over as-is (no extra in-memory copy)
+            result = cloudinary.uploader.upload(
+                file=file_obj,
+                timeout=getattr(settings, 'CLOUDINARY_UPLOAD_TIMEOUT', 120),
+                **options
+            )
+
+        web_url, thumb_url = self.variant_urls(result.get("secure_url", ""))
+        return result, web_url, thumb_url
+
+    def _upload_chunked(self, file_obj, size, options):
+        """
+        Upload in Content-Range chunks sharing one X-Unique-Upload-Id.
+        Each chunk is retried with exponential backoff. Progress (upload id and
+        acknowledged offset) is kept in the 'shared' cache, keyed by content hash
+        and destination, so a later attempt at the same upload - from any worker -
+        resumes after the last acknowledged chunk instead of resending the whole file.
+        """
+        chunk_size = getattr(settings, 'CLOUDINARY_CHUNK_SIZE', 5 * 1024 * 1024)
+        retries = getattr(settings, 'CLOUDINARY_CHUNK_RETRIES', 4)
+        backoff = getattr(settings, 'CLOUDINARY_CHUNK_BACKOFF', 0.5)
+        timeout = getattr(settings, 'CLOUDINARY_CHUNK_TIMEOUT', 60)
+
+        state_key = f"cloudinary-chunked:{options['folder']}/{options['public_id']}:{content_sha256(file_obj)}"
+        resume_cache = caches['shared']
+        state = resume_cache.get(state_key) or {'upload_id': cloudinary.utils.random_public_id(), 'offset': 0}
+        if state['offset']:
+            logger.info('Resuming chunked upload of %s at byte %s/%s', options['public_id'], state['offset'], size)
+
+        filename = f"{options['public_id']}.webp"
+        result = None
+        while state['offset'] < size:
+            file_obj.seek(state['offset'])
+            chunk = file_obj.read(chunk_size)
+            end = state['offset'] + len(chunk) - 1
+            http_headers = {
+                'Content-Range': f'bytes {state["offset"]}-{end}/{size}',
+                'X-Unique-Upload-Id': state['upload_id'],
+            }
+
+            for attempt in range(retries + 1):
+                try:
+                    result = cloudinary.uploader.upload_large_part(
+                        (filename, chunk), http_headers=http_headers, timeout=timeout, **options
+                    )
+                    break
+                except cloudinary.exceptions.Error as e:
+                    if attempt == retries:
+                        raise
+                    delay = backoff * (2 ** attempt)
+                    logger.warning('Chunk %s of %s failed (%s), retrying in %.1fs', http_headers['Content-Range'], options['public_id'], e, delay)
+                    time.sleep(delay)
+
+            state['offset'] = end + 1
+            if state['offset'] < size:
+                resume_cache.set(state_key, state, getattr(settings, 'CLOUDINARY_CHUNK_RESUME_TTL', 3600))
+
+        resume_cache.delete(state_key)
+        file_obj.seek(0)
+        return result
+
+    def variant_urls(self, secure_url):
+        if "/upload/" in secure_url:
+            web_url = secure_url.replace("/upload/", "/upload/f_auto,q_auto/")
+            thumb_url = secure_url.replace("/upload/", "/upload/c_fill,g_face,w_480,h_320/")
+        else:
+            web_url = secure_url
+            thumb_url = secure_url
+        return web_url, thumb_url
+
+    def public_id_from_url(self, url):
+        match = CLOUDINARY_URL_RE.match(url)
+        if not match:
+            return None
+        _, _, segments = split_cloudinary_path(match.group('path'))
+        if not segments:
+            return None
+        # Strip the delivery format extension
+        segments[-1] = segments[-1].rsplit('.', 1)[0]
+        return '/'.join(segments)
+
+    def list_resources(self, prefix, max_results=100, next_cursor=None, since=None):
+        params = {
+            'type': 'upload',
+            'max_results': max_results,
+            'resource_type': 'image',
+        }
+        if since:
+            # start_at can't be combined with prefix, so the prefix is applied here instead
+            params['start_at'] = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+            params['direction'] = 'asc'
+        else:
+            params['prefix'] = prefix
+        if next_cursor:
+            params['next_cursor'] = next_cursor
+        result = cloudinary.api.resources(**params)
+        return {
+            'resources': [r for r in result.get('resources', []) if r.get('public_id', '').startswith(prefix)],
+            'next_cursor': result.get('next_cursor'),
+        }
+
+    def delete(self, public_ids, invalidate=True):
+        result = cloudinary.api.delete_resources(list(public_ids), resource_type='image', invalidate=invalidate)
+        return {'deleted': result.get('deleted', {})}
+
+
+class LocalStorageBackend(MediaStorageBackend):
+    """
+    Media stored on the local filesystem under MEDIA_ROOT/<MEDIA_LOCAL_SUBDIR>.
+
+    Layout per asset (public_id "folder/name"):
+        folder/name.webp          original as uploaded
+        folder/name.web.webp      web variant, limited to WEB_MAX_WIDTH
+        folder/name.thumb.webp    480x320 centre-cropped thumbnail
+    """
+    VARIANT_SUFFIXES = ('.web.webp', '.thumb.webp')
+
+    def __init__(self, root=None, base_url=None):
+        subdir = getattr(settings, 'MEDIA_LOCAL_SUBDIR', 'library')
+        self.root = str(root or os.path.join(settings.MEDIA_ROOT, subdir))
+        self.base_url = base_url or f"{settings.MEDIA_URL.rstrip('/')}/{subdir}/"
+
+    def _path(self, public_id, suffix='.webp'):
+        path = os.path.normpath(os.path.join(self.root, public_id + suffix))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'Invalid public_id: {public_id}')
+        return path
+
+    def _url(self, public_id, suffix='.webp'):
+        return f'{self.base_url}{public_id}{suffix}'
+
+    def _resource(self, public_id):
+        path = self._path(public_id)
+        with Image.open(path) as im:
+            width, height = im.size
+            fmt = (im.format or 'webp').lower()
+        stat = os.stat(path)
+        return {
+            'public_id': public_id,
+            'secure_url': self._url(public_id),
+            'url': self._url(public_id),
+            'format': fmt,
+            'resource_type': 'image',
+            'bytes': stat.st_size,
+            'width': width,
+            'height': height,
+            'created_at': datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+
+    def upload(self, file_obj, folder, public_id, tags=None, overwrite=True, invalidate=False):
+        full_id = f'{(folder or DEFAULT_FOLDER).strip("/")}/{public_id}'
+        path = self._path(full_id)
+
+        if not overwrite and os.path.exists(path):
+            result = self._resource(full_id)
+            result['existing'] = True
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a sibling temp file and rename, so readers never see a partial image
+            tmp_path = f'{path}.part'
+            file_obj.seek(0)
+            with open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(file_obj, dst)
+            os.replace(tmp_path, path)
+            self._write_variants(full_id)
+            result = self._resource(full_id)
+            # Variants are generated synchronously, so the eager variant is ready right away
+            web_path = self._path(full_id, '.web.webp')
+            with Image.open(web_path) as web:
+                result['eager'] = [{
+                    'secure_url': self._url(full_id, '.web.webp'),
+                    'bytes': os.path.getsize(web_path),
+                    'width': web.width,
+                    'height': web.height,
+                }]
+
+        result['tags'] = list(tags or [])
+        web_url, thumb_url = self.variant_urls(result['secure_url'])
+        return result, web_url, thumb_url
+
+    def _write_variants(self, public_id):
+        with Image.open(self._path(public_id)) as im:
+            im = ImageOps.exif_transpose(im)
+            if im.mode not in ('RGB', 'RGBA'):
+                im = im.convert('RGBA' if 'A' in im.getbands() else 'RGB')
+
+            web = im
+            if im.width > WEB_MAX_WIDTH:
+                web = im.resize((WEB_MAX_WIDTH, round(im.height * WEB_MAX_WIDTH / im.width)), Image.LANCZOS)
+            web.save(self._path(public_id, '.web.webp'), format='WEBP', quality=80, method=4)
+
+            thumb = ImageOps.fit(im, THUMB_SIZE, Image.LANCZOS)
+            thumb.save(self._path(public_id, '.thumb.webp'), format='WEBP', quality=75, method=4)
+
+    def variant_urls(self, secure_url):
+        if secure_url.startswith(self.base_url) and secure_url.endswith('.webp'):
+            stem = secure_url[:-len('.webp')]
+            return f'{stem}.web.webp', f'{stem}.thumb.webp'
+        return secure_url, secure_url
+
+    def public_id_from_url(self, url):
+        if not url.startswith(self.base_url):
+            return None
+        rest = url[len(self.base_url):]
+        for suffix in self.VARIANT_SUFFIXES + ('.webp',):
+            if rest.endswith(suffix):
+                return rest[:-len(suffix)]
+        return None
+
+    def list_resources(self, prefix, max_results=100, next_cursor=None, since=None):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.webp') or filename.endswith(self.VARIANT_SUFFIXES):
+                    continue
+                path = os.path.join(dirpath, filename)
+                public_id = os.path.relpath(path, self.root)[:-len('.webp')].replace(os.sep, '/')
+                if not public_id.startswith(prefix):
+                    continue
+                mtime = os.path.getmtime(path)
+                if since and mtime < since.timestamp():
+                    continue
+                entries.append((mtime if since else 0, public_id))
+        entries.sort()
+        public_ids = [public_id for _, public_id in entries]
+
+        # The cursor is simply the offset into the sorted listing
+        start = int(next_cursor or 0)
+        page = public_ids[start:start + max_results]
+        end = start + len(page)
+        return {
+            'resources': [self._resource(public_id) for public_id in page],
+            'next_cursor': str(end) if end < len(public_ids) else None,
+        }
+
+    def delete(self, public_ids, invalidate=True):
+        deleted = {}
+        for public_id in public_ids:
+            found = False
+            for suffix in ('.webp',) + self.VARIANT_SUFFIXES:
+                try:
+                    os.remove(self._path(public_id, suffix))
+                    found = True
+                except FileNotFoundError:
+                    pass
+            deleted[public_id] = 'deleted' if found else 'not_found'
+        return {'deleted': deleted}
+
+
+def eager_variant_fields(result):
+    """
+    MediaAsset eager_* values from an upload result or an eager notification payload.
+    Asynchronous eager variants come back as "processing" (no bytes) until the
+    notification arrives.
+    """
+    eager = (result.get('eager') or [{}])[0]
+    ready = bool(eager.get('bytes')) and eager.get('status') not in ('processing', 'pending', 'failed')
+    return {
+        'eager_ready': ready,
+        'eager_url': (eager.get('secure_url') or eager.get('url', '')) if ready else '',
+        'eager_bytes': eager.get('bytes', 0) if ready else 0,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_storage_backend():
+    """Return the process-wide storage backend selected by MEDIA_STORAGE_BACKEND"""
+    backend_path = getattr(settings, 'MEDIA_STORAGE_BACKEND', 'dashboard.storage.CloudinaryStorageBackend')
+    return import_string(backend_path)()
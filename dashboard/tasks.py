@@ -0,0 +1,92 @@
+"""
+Background media work that shouldn't hold up the request that triggered it.
+
+Tasks run on a small in-process thread pool. A restart drops anything still
+queued, which is safe: every task here is an optimisation of an asset that is
+already stored and usable.
+"""
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from myApp.models import MediaAsset
+from .admission import get_compression_gate
+from .gallery import invalidate_gallery_cache
+from .storage import eager_variant_fields, get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media-tasks')
+
+
+def schedule_best_effort_reencode(asset, src_file, method=6):
+    """
+    Queue a slow, best-effort re-encode of a freshly uploaded asset.
+    The source is copied to a private temp file because the upload's own temp
+    file is removed when the request finishes.
+    """
+    fd, source_path = tempfile.mkstemp(prefix='reencode-', suffix='.src')
+    with os.fdopen(fd, 'wb') as dst:
+        src_file.seek(0)
+        shutil.copyfileobj(src_file, dst)
+    src_file.seek(0)
+
+    transaction.on_commit(lambda: _executor.submit(reencode_asset, asset.id, source_path, method))
+
+
+def reencode_asset(asset_id, source_path, method):
+    """Re-encode at the given WebP effort level and replace the stored asset if it got smaller"""
+    # Imported here: views imports this module
+    from .views import MAX_BYTES, aggressive_compress_to_file, file_size, smart_compress_to_file
+
+    encoded = None
+    try:
+        asset = MediaAsset.objects.filter(id=asset_id, is_active=True).first()
+        if asset is None:
+            return
+
+        # Shares the CPU budget with interactive uploads, but never gets rejected
+        with get_compression_gate().slot(blocking=True):
+            with open(source_path, 'rb') as src:
+                encoded = smart_compress_to_file(src, method=method)
+                if file_size(encoded) > MAX_BYTES:
+                    encoded.close()
+                    encoded = aggressive_compress_to_file(src, method=method)
+
+        new_size = file_size(encoded)
+        if new_size >= asset.bytes_size:
+            logger.info('Re-encode of %s saved nothing (%s >= %s bytes)', asset.public_id, new_size, asset.bytes_size)
+            return
+
+        # Same public_id, overwritten in place; delivery URLs stay valid and the CDN copy is invalidated
+        folder, _, name = asset.public_id.rpartition('/')
+        result, _, _ = get_storage_backend().upload(
+            file_obj=encoded,
+            folder=folder,
+            public_id=name,
+            tags=[t for t in asset.tags_csv.split(',') if t],
+            overwrite=True,
+            invalidate=True,
+        )
+        MediaAsset.objects.filter(id=asset_id).update(
+            bytes_size=result.get('bytes', new_size),
+            updated_at=timezone.now(),
+            **eager_variant_fields(result),
+        )
+        invalidate_gallery_cache()
+        logger.info('Re-encoded %s: %s -> %s bytes', asset.public_id, asset.bytes_size, result.get('bytes', new_size))
+    except Exception:
+        logger.exception('Best-effort re-encode failed for MediaAsset %s', asset_id)
+    finally:
+        if encoded is not None:
+            encoded.close()
+        try:
+            os.remove(source_path)
+        except OSError:
+            pass
+        close_old_connections()
@@ -1,3 +1,259 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
 
+import cloudinary
+import cloudinary.exceptions
+import cloudinary.utils
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
 
+from myApp.models import MediaAsset
+
+from .gallery import decode_cursor, encode_cursor, gallery_page
+from .storage import CloudinaryStorageBackend
+from .views import allocate_public_id
+from .upload_standin import UploadStandIn
+
+CHUNK_SIZE = 1000
+
+
+@override_settings(
+    CLOUDINARY_CHUNK_SIZE=CHUNK_SIZE,
+    CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD=2 * CHUNK_SIZE,
+    CLOUDINARY_CHUNK_RETRIES=2,
+    CLOUDINARY_CHUNK_BACKOFF=0,
+)
+class ChunkedUploadTests(SimpleTestCase):
+    """Chunked Cloudinary uploads against the local stand-in, with injected failures"""
+
+    def setUp(self):
+        self.standin = UploadStandIn().start()
+        self.addCleanup(self.standin.stop)
+
+        config = cloudinary.config()
+        saved = {key: getattr(config, key, None) for key in ('cloud_name', 'api_key', 'api_secret', 'upload_prefix')}
+        cloudinary.config(cloud_name='standin', api_key='key', api_secret='secret', upload_prefix=self.standin.url)
+        self.addCleanup(lambda: [setattr(config, key, value) for key, value in saved.items()])
+
+        # Resume state must survive in the shared cache, not in this process
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        shared = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+
+        self.backend = CloudinaryStorageBackend()
+        self.data = os.urandom(3 * CHUNK_SIZE + 500)
+
+    def upload(self):
+        return self.backend.upload(io.BytesIO(self.data), 'insight-seeker/uploads', 'big')
+
+    def test_failed_chunks_are_retried(self):
+        self.standin.fail_next(2, status=502, after=1)
+
+        with self.assertLogs('dashboard.storage', 'WARNING'):
+            result, _, _ = self.upload()
+
+        self.assertEqual(result['bytes'], len(self.data))
+        self.assertEqual(self.standin.files['insight-seeker/uploads/big'], self.data)
+        self.assertEqual([r['status'] for r in self.standin.requests], [200, 502, 502, 200, 200, 200])
+
+    def test_killed_chunk_resumes_at_acknowledged_offset(self):
+        # First chunk is acknowledged, then the second is killed on every attempt
+        self.standin.fail_next(3, status=None, after=1)
+        with self.assertLogs('dashboard.storage', 'WARNING'), self.assertRaises(cloudinary.exceptions.Error):
+            self.upload()
+        first_attempt = len(self.standin.requests)
+
+        caches['default'].clear()  # as if the retry reached another worker
+        result, _, _ = self.upload()
+
+        resumed = self.standin.requests[first_attempt:]
+        self.assertEqual(resumed[0]['range'], f'bytes {CHUNK_SIZE}-{2 * CHUNK_SIZE - 1}/{len(self.data)}')
+        self.assertEqual(resumed[0]['upload_id'], self.standin.requests[0]['upload_id'])
+        self.assertEqual(len(resumed), 3)
+        self.assertEqual(result['bytes'], len(self.data))
+        self.assertEqual(self.standin.files['insight-seeker/uploads/big'], self.data)
+
+    def test_small_files_go_up_in_one_request(self):
+        self.data = os.urandom(CHUNK_SIZE)
+
+        self.upload()
+
+        self.assertEqual([r['range'] for r in self.standin.requests], [''])
+        self.assertEqual(self.standin.files['insight-seeker/uploads/big'], self.data)
+
+
+def create_asset(public_id, **fields):
+    return MediaAsset.objects.create(
+        title=public_id.rsplit('/', 1)[-1],
+        public_id=public_id,
+        secure_url=f'https://res.cloudinary.com/demo/image/upload/v1/{public_id}.jpg',
+        web_url=f'https://res.cloudinary.com/demo/image/upload/f_auto,q_auto/v1/{public_id}.jpg',
+        thumb_url=f'https://res.cloudinary.com/demo/image/upload/c_fill,w_480,h_320/v1/{public_id}.jpg',
+        format='jpg',
+        **fields,
+    )
+
+
+@override_settings(CLOUDINARY_VERIFY_NOTIFICATIONS=False)
+class CloudinaryNotificationTests(TestCase):
+    """The eager_notification_url webhook, fed canned notification payloads"""
+
+    url = reverse('dashboard:cloudinary_notification')
+
+    def setUp(self):
+        self.asset = create_asset('insight-seeker/uploads/hero')
+
+    def notify(self, payload, **headers):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json', headers=headers)
+
+    def eager_payload(self, **eager):
+        return {
+            'notification_type': 'eager',
+            'public_id': self.asset.public_id,
+            'eager': [{
+                'transformation': 'f_webp,q_auto',
+                'status': 'complete',
+                'bytes': 48213,
+                'secure_url': 'https://res.cloudinary.com/demo/image/upload/f_webp,q_auto/v1/insight-seeker/uploads/hero.webp',
+                **eager,
+            }],
+        }
+
+    def test_eager_notification_marks_variant_ready(self):
+        response = self.notify(self.eager_payload())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'success': True, 'updated': 1})
+        self.asset.refresh_from_db()
+        self.assertTrue(self.asset.eager_ready)
+        self.assertEqual(self.asset.eager_url, self.eager_payload()['eager'][0]['secure_url'])
+        self.assertEqual(self.asset.eager_bytes, 48213)
+
+    def test_failed_eager_variant_stays_unready(self):
+        self.notify(self.eager_payload(status='failed'))
+
+        self.asset.refresh_from_db()
+        self.assertFalse(self.asset.eager_ready)
+        self.assertEqual((self.asset.eager_url, self.asset.eager_bytes), ('', 0))
+
+    def test_other_notification_types_are_ignored(self):
+        payload = {**self.eager_payload(), 'notification_type': 'upload'}
+
+        response = self.notify(payload)
+
+        self.assertEqual(response.json(), {'success': True, 'updated': 0})
+        self.asset.refresh_from_db()
+        self.assertFalse(self.asset.eager_ready)
+
+    @override_settings(CLOUDINARY_VERIFY_NOTIFICATIONS=True)
+    def test_signature_is_verified(self):
+        config = cloudinary.config()
+        saved = config.api_secret
+        cloudinary.config(api_secret='secret')
+        self.addCleanup(setattr, config, 'api_secret', saved)
+        body = json.dumps(self.eager_payload())
+        timestamp = int(time.time())
+
+        bad = self.notify(self.eager_payload(), x_cld_timestamp=str(timestamp), x_cld_signature='0' * 40)
+        self.asset.refresh_from_db()
+        self.assertEqual(bad.status_code, 403)
+        self.assertFalse(self.asset.eager_ready)
+
+        signature = cloudinary.utils.compute_hex_hash(f'{body}{timestamp}secret', config.signature_algorithm)
+        good = self.notify(self.eager_payload(), x_cld_timestamp=str(timestamp), x_cld_signature=signature)
+        self.assertEqual(good.status_code, 200)
+        self.asset.refresh_from_db()
+        self.assertTrue(self.asset.eager_ready)
+
+
+class AllocatePublicIdTests(TestCase):
+    folder = 'insight-seeker/uploads'
+
+    def test_unused_slug_is_kept(self):
+        create_asset(f'{self.folder}/other')
+
+        self.assertEqual(allocate_public_id(self.folder, 'hero'), 'hero')
+
+    def test_taken_slug_gets_next_suffix(self):
+        for public_id in ('hero', 'hero-1', 'hero-4'):
+            create_asset(f'{self.folder}/{public_id}')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_public_id(self.folder, 'hero'), 'hero-5')
+
+    def test_longer_slugs_sharing_the_prefix_do_not_count(self):
+        for public_id in ('hero', 'hero-banner', 'hero-2x', 'heroes-7'):
+            create_asset(f'{self.folder}/{public_id}')
+
+        self.assertEqual(allocate_public_id(self.folder, 'hero'), 'hero-1')
+
+    def test_suffixed_ids_without_the_base_leave_it_free(self):
+        create_asset(f'{self.folder}/hero-3')
+
+        self.assertEqual(allocate_public_id(self.folder, 'hero'), 'hero')
+
+
+class GalleryPagingTests(TestCase):
+    """Keyset pagination of gallery_page() and its cursors"""
+
+    def setUp(self):
+        cache.clear()  # versions restart with each test's database, cached pages don't
+        start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        self.assets = []
+        for index in range(7):
+            asset = create_asset(f'insight-seeker/uploads/image-{index}')
+            # Pairs share a timestamp so the id tie-break is exercised
+            MediaAsset.objects.filter(pk=asset.pk).update(created_at=start + timedelta(minutes=index // 2))
+            self.assets.append(asset)
+        # Later index: later timestamp, or the same one and a higher id
+        self.newest_first = [asset.id for asset in reversed(self.assets)]
+
+    def page_ids(self, **kwargs):
+        page = gallery_page(page_size=3, **kwargs)
+        return [image['id'] for image in page['images']], page['next_cursor']
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_malformed_cursors_raise_value_error(self):
+        for cursor in ('', 'not-base64!', encode_cursor(datetime(2024, 5, 1), 1)[:-3], 'bm9waXBl'):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_pages_cover_every_asset_once_newest_first(self):
+        seen, cursor = [], None
+        for _ in range(3):
+            ids, cursor = self.page_ids(cursor=cursor)
+            seen.extend(ids)
+        self.assertIsNone(cursor)
+        self.assertEqual(seen, self.newest_first)
+
+    def test_inactive_assets_are_skipped(self):
+        MediaAsset.objects.filter(pk=self.newest_first[1]).update(is_active=False)
+        cache.clear()
+
+        ids, _ = self.page_ids()
+
+        self.assertEqual(ids, [self.newest_first[0]] + self.newest_first[2:4])
+
+    def test_saving_an_asset_invalidates_cached_pages(self):
+        first, _ = self.page_ids()
+        with self.assertNumQueries(1):  # the cache version only
+            self.assertEqual(self.page_ids()[0], first)
+
+        newest = create_asset('insight-seeker/uploads/latest')
+
+        self.assertEqual(self.page_ids()[0], [newest.id] + first[:2])
@@ -0,0 +1,166 @@
+"""
+Local stand-in for Cloudinary's upload API, for exercising chunked uploads
+(per-chunk retry, resume) without the network and with injected failures.
+
+It accepts what CloudinaryStorageBackend sends to /v1_1/<cloud>/image/upload:
+plain uploads and upload_large_part chunks (Content-Range + X-Unique-Upload-Id).
+Like Cloudinary, it rejects a chunk that doesn't start where the bytes received
+so far for that upload id end, so a client that resends or skips data fails.
+Point the SDK at it with CLOUDINARY_UPLOAD_PREFIX=<url>; the cloudinary_standin
+management command runs one from the shell.
+
+    standin = UploadStandIn().start()
+    standin.fail_next(3, status=None, after=1)  # drop the connection on requests 2-4
+    ...
+    standin.stop()
+"""
+import json
+import random
+import re
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPLOAD_PATH_RE = re.compile(r'^/v1_1/(?P<cloud>[^/]+)/image/upload/?$')
+CONTENT_RANGE_RE = re.compile(r'^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+)$')
+
+
+def parse_multipart(content_type, body):
+    """{field name: str or bytes (for file parts)} of a multipart/form-data body"""
+    message = BytesParser(policy=HTTP).parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + body)
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        payload = part.get_payload(decode=True) or b''
+        fields[name] = payload if part.get_filename() else payload.decode()
+    return fields
+
+
+class UploadStandIn:
+    """
+    Threaded HTTP server emulating the upload endpoint.
+    fail_rate makes that fraction of requests fail at random with fail_status
+    (None drops the connection without a response); fail_next() schedules
+    failures deterministically. Every request is recorded in requests.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, fail_rate=0.0, fail_status=502):
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.requests = []  # {'upload_id', 'range', 'status'} per request, in arrival order
+        self.files = {}  # public_id -> bytes of completed uploads
+        self._parts = {}  # upload id -> bytearray received so far
+        self._faults = []  # per upcoming request: status to fail with, or False to serve it
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fail_next(self, count=1, status=502, after=0):
+        """Serve the next `after` requests normally, then fail `count` of them with status (None: drop the connection)"""
+        with self._lock:
+            self._faults.extend([False] * after + [status] * count)
+
+    def _next_fault(self):
+        """Status to fail the current request with, False to serve it"""
+        with self._lock:
+            if self._faults:
+                return self._faults.pop(0)
+        if self.fail_rate and random.random() < self.fail_rate:
+            return self.fail_status
+        return False
+
+    def _handle(self, cloud, headers, fields):
+        """(status, JSON body) for one upload request that wasn't failed"""
+        public_id = fields.get('public_id') or 'upload'
+        if fields.get('folder'):
+            public_id = f"{fields['folder'].rstrip('/')}/{public_id}"
+        data = fields.get('file', b'')
+        if isinstance(data, str):
+            data = data.encode()
+
+        content_range = headers.get('Content-Range')
+        if content_range:
+            match = CONTENT_RANGE_RE.match(content_range)
+            upload_id = headers.get('X-Unique-Upload-Id', '')
+            if not match or not upload_id:
+                return 400, {'error': {'message': 'Invalid Content-Range or missing X-Unique-Upload-Id'}}
+            start, end, total = (int(match.group(key)) for key in ('start', 'end', 'total'))
+            with self._lock:
+                received = self._parts.setdefault(upload_id, bytearray())
+                if start != len(received) or end - start + 1 != len(data):
+                    return 400, {'error': {'message': f'Chunk {content_range} does not continue at byte {len(received)}'}}
+                received.extend(data)
+                if end + 1 < total:
+                    return 200, {'done': False, 'public_id': public_id}
+                data = bytes(self._parts.pop(upload_id))
+
+        with self._lock:
+            self.files[public_id] = data
+        return 200, {
+            'public_id': public_id,
+            'version': 1,
+            'secure_url': f'https://res.cloudinary.com/{cloud}/image/upload/v1/{public_id}.webp',
+            'bytes': len(data),
+            'width': 0,
+            'height': 0,
+            'format': 'webp',
+            'eager': [],
+        }
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                record = {
+                    'upload_id': self.headers.get('X-Unique-Upload-Id', ''),
+                    'range': self.headers.get('Content-Range', ''),
+                }
+                standin.requests.append(record)
+
+                match = UPLOAD_PATH_RE.match(self.path)
+                fault = standin._next_fault()
+                if fault is None:
+                    # Killed mid-request: no response at all
+                    record['status'] = None
+                    self.close_connection = True
+                    return
+                if fault:
+                    status, payload = fault, {'error': {'message': f'Injected failure ({fault})'}}
+                elif not match:
+                    status, payload = 404, {'error': {'message': f'Unknown endpoint {self.path}'}}
+                else:
+                    fields = parse_multipart(self.headers.get('Content-Type', ''), body)
+                    status, payload = standin._handle(match.group('cloud'), self.headers, fields)
+                record['status'] = status
+
+                response = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -17,5 +17,9 @@ urlpatterns = [
     path('pages/<int:page_id>/sections/add/', views.section_add, name='section_add'),
     path('upload-image/', views.upload_image, name='upload_image'),
     path('gallery-images/', views.gallery_images, name='gallery_images'),
+    path('media-search/', views.media_search, name='media_search'),
+    path('media/<int:asset_id>/usage/', views.media_usage, name='media_usage'),
+    path('compression-stats/', views.compression_stats, name='compression_stats'),
+    path('cloudinary/notify/', views.cloudinary_notification, name='cloudinary_notification'),
 ]
 
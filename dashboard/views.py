@@ -1,23 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.db import transaction, models
-from myApp.models import Page, Section, MediaAsset
+from django.db import IntegrityError, transaction, models
+from myApp.cdn import purge_page
+from myApp.lcp import refresh_lcp_hints
+from myApp.render_hints import RENDER_HINTS_VERSION
+from myApp.models import Page, Section, MediaAsset, MediaUsage, media_asset_slug
+from django.utils import timezone
 from django.utils.text import slugify
 import json
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+import cloudinary.utils
 from PIL import Image, ImageOps
-import io
-from django.core.files.uploadedfile import InMemoryUploadedFile
-import sys
+import os
+import tempfile
+import logging
+from django.conf import settings
+from .admission import AdmissionRejected, get_compression_gate
+from .gallery import gallery_cache_version, gallery_page, invalidate_gallery_cache, save_asset_tags
+from .search import search_assets
+from .storage import eager_variant_fields, get_storage_backend
+from .transport import transport_stats
+from .tasks import schedule_best_effort_reencode
+from .imaging import (
+    FEATURELESS_HASHES, check_decode_budget, content_sha256, luminance_array, perceptual_hash,
+    placeholder_metadata, ssim,
+)
+
+logger = logging.getLogger(__name__)
 
 # Constants
 MAX_BYTES = 10 * 1024 * 1024  # 10MB hard limit
 TARGET_BYTES = int(9.3 * 1024 * 1024)  # 9.3MB compression target
+PUBLIC_ID_ATTEMPTS = 3  # public_id allocation retries when a concurrent upload wins the name
 
 
 @login_required
@@ -144,7 +161,7 @@ def section_add(request, page_id):
     default_config = get_default_config_for_section_type(section_type)
     
     # Create section with both draft and published configs
-    section = Section.objects.create(
+    section = Section(
         page=page,
         section_type=section_type,
         internal_label=internal_label,
@@ -153,6 +170,10 @@ def section_add(request, page_id):
         published_config=default_config.copy(),  # Also publish it initially
         section_config=default_config,  # Legacy field for backward compatibility
     )
+    section.refresh_render_hints()
+    section.save()
+    refresh_lcp_hints(page)
+    purge_page(page)
     
     messages.success(request, f'Section "{internal_label}" added successfully')
     return redirect('dashboard:section_edit', section_id=section.id)
@@ -216,10 +237,12 @@ def section_edit(request, section_id):
 def section_delete(request, section_id):
     """Delete a section"""
     section = get_object_or_404(Section, id=section_id)
-    page_id = section.page.id
+    page = section.page
     section.delete()
+    refresh_lcp_hints(page)
+    purge_page(page)
     messages.success(request, 'Section deleted successfully')
-    return redirect('dashboard:page_builder', page_id=page_id)
+    return redirect('dashboard:page_builder', page_id=page.id)
 
 
 @login_required
@@ -229,6 +252,8 @@ def section_toggle(request, section_id):
     section = get_object_or_404(Section, id=section_id)
     section.is_enabled = not section.is_enabled
     section.save()
+    refresh_lcp_hints(section.page)
+    purge_page(section.page)
     return JsonResponse({'is_enabled': section.is_enabled})
 
 
@@ -243,10 +268,19 @@ def publish_page(request, page_id):
     for section in sections:
         if section.draft_config and section.draft_config != section.published_config:
             section.published_config = section.draft_config.copy()
+            # Derived presentation values are computed here once, not on every render
+            section.refresh_render_hints()
             section.save()
             published_count += 1
+        elif (section.render_hints or {}).get('version') != RENDER_HINTS_VERSION:
+            # Published before hints existed (or their derivation changed) - backfill
+            section.refresh_render_hints()
+            section.save(update_fields=['render_hints'])
+    # Preload hints are part of the published state - recompute them with it
+    refresh_lcp_hints(page)
     
     if published_count > 0:
+        purge_page(page)
         messages.success(request, f'Published {published_count} section change(s)! The live site has been updated.')
     else:
         messages.info(request, 'No draft changes to publish.')
@@ -307,6 +341,8 @@ def section_move(request, section_id, direction):
                 section.sort_order, next_section.sort_order = next_section.sort_order, section.sort_order
                 section.save()
                 next_section.save()
+    refresh_lcp_hints(section.page)
+    purge_page(section.page)
     
     return redirect('dashboard:page_builder', page_id=section.page.id)
 
@@ -539,29 +575,45 @@ def parse_form_data_to_config(post_data, section_type):
     return config
 
 
-def smart_compress_to_bytes(src_file) -> bytes:
+def spooled_output():
+    """Temp file for encoded output - stays in memory up to IMAGE_UPLOAD_SPOOL_MAX_BYTES, then spills to disk"""
+    return tempfile.SpooledTemporaryFile(max_size=getattr(settings, 'IMAGE_UPLOAD_SPOOL_MAX_BYTES', 2 * 1024 * 1024))
+
+
+def file_size(f) -> int:
+    """Size of a seekable file object without reading it"""
+    pos = f.tell()
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(pos)
+    return size
+
+
+def open_image_for_encode(src_file, max_w):
     """
-    Smart compression with iterative quality reduction - always converts to WebP
-    Tries to get under TARGET_BYTES (9.3MB), but will return best attempt even if over
+    Open an upload for re-encoding: bounded decode, EXIF auto-rotate,
+    width capped at max_w and flattened to RGB
     """
     # Reset file pointer
     if hasattr(src_file, 'seek'):
         src_file.seek(0)
     
-    # Open image
+    # Open image (lazy - only the header is read here)
     im = Image.open(src_file)
     
+    # JPEG can decode straight to a reduced scale, so very large photos never
+    # materialise more pixels than we'd keep after resizing
+    if im.width > max_w:
+        im.draft('RGB', (max_w, max_w))
+    check_decode_budget(im)
+    
     # Auto-rotate based on EXIF
     try:
         im = ImageOps.exif_transpose(im)
     except Exception:
         pass  # If EXIF fails, continue with original
     
-    # Always use WebP for best compression
-    out_fmt = "WEBP"
-    
-    # Cap extreme dimensions (max 5000px width) - resize larger images
-    max_w = 5000
+    # Cap extreme dimensions - resize larger images
     if im.width > max_w:
         im = im.resize((max_w, int(im.height * (max_w / im.width))), Image.LANCZOS)
     
@@ -576,150 +628,191 @@ def smart_compress_to_bytes(src_file) -> bytes:
     elif im.mode != 'RGB':
         im = im.convert('RGB')
     
-    # Iterative quality reduction - always target WebP
-    q = 85  # Start quality
-    min_q = 40  # Lower minimum for WebP
-    step = 3
-    
-    best_data = None
+    return im
+
+
+def encode_webp_ladder(im, qualities, method=6):
+    """
+    Encode at each quality in turn into spooled temp files and return the first
+    result under MAX_BYTES (or the smallest attempt). Only the current and best
+    candidates are held at any time.
+    Returns a file object positioned at 0.
+    """
+    best = None
     best_size = float('inf')
     
-    while q >= min_q:
-        buf = io.BytesIO()
+    for q in qualities:
+        out = spooled_output()
         try:
-            im.save(buf, format="WEBP", quality=q, method=6)
-            data = buf.getvalue()
-            
-            # Track best result
-            if len(data) < best_size:
-                best_size = len(data)
-                best_data = data
-            
-            # If we hit target, return immediately
-            if len(data) <= TARGET_BYTES:
-                return data
-            
-            # If we're under max, that's acceptable too
-            if len(data) <= MAX_BYTES:
-                return data
-            
-        except Exception as e:
+            im.save(out, format="WEBP", quality=q, method=method)
+            size = out.tell()
+        except Exception:
             # If save fails, try next quality
-            pass
+            out.close()
+            continue
         
-        # Reduce quality and try again
-        q = max(min_q, q - step)
+        # If we're under max, that's acceptable
+        if size <= MAX_BYTES:
+            if best is not None:
+                best.close()
+            out.seek(0)
+            return out
+        
+        # Track best result
+        if size < best_size:
+            if best is not None:
+                best.close()
+            best, best_size = out, size
+        else:
+            out.close()
+    
+    if best is None:
+        raise ValueError('Could not encode image as WebP')
     
     # Return best attempt
-    return best_data if best_data is not None else im.tobytes()
+    best.seek(0)
+    return best
 
 
-def aggressive_compress_to_bytes(src_file) -> bytes:
+def encode_webp_perceptual(im, min_q=40, max_q=85, method=6):
     """
-    More aggressive compression - reduces dimensions further and uses lower quality
-    Used as fallback if smart_compress still results in file over 10MB
+    Binary-search the lowest WebP quality whose SSIM against the source stays at or
+    above IMAGE_SSIM_THRESHOLD (compared on a downsampled luminance channel).
+    Returns a file object positioned at 0, or None if no quality in range qualifies.
     """
-    # Reset file pointer
-    if hasattr(src_file, 'seek'):
-        src_file.seek(0)
+    threshold = getattr(settings, 'IMAGE_SSIM_THRESHOLD', 0.99)
+    max_side = getattr(settings, 'IMAGE_SSIM_MAX_SIDE', 512)
+    reference = luminance_array(im, max_side)
     
-    # Open image
-    im = Image.open(src_file)
-    
-    # Auto-rotate based on EXIF
-    try:
-        im = ImageOps.exif_transpose(im)
-    except Exception:
-        pass
+    best = None
+    best_q = best_score = None
+    lo, hi = min_q, max_q
+    while lo <= hi:
+        q = (lo + hi) // 2
+        out = spooled_output()
+        im.save(out, format="WEBP", quality=q, method=method)
+        size = out.tell()
+        out.seek(0)
+        with Image.open(out) as candidate:
+            score = ssim(reference, luminance_array(candidate, max_side))
+        
+        if score >= threshold and size <= MAX_BYTES:
+            # Good enough - try lower
+            if best is not None:
+                best.close()
+            best, best_q, best_score = out, q, score
+            hi = q - 1
+        else:
+            out.close()
+            lo = q + 1
     
-    # More aggressive dimension capping (max 3000px width)
-    max_w = 3000
-    if im.width > max_w:
-        im = im.resize((max_w, int(im.height * (max_w / im.width))), Image.LANCZOS)
+    if best is None:
+        return None
+    logger.info('Perceptual WebP encode picked q=%s (SSIM %.4f >= %.4f)', best_q, best_score, threshold)
+    best.seek(0)
+    return best
+
+
+def smart_compress_to_file(src_file, method=6):
+    """
+    Smart compression with iterative quality reduction - always converts to WebP
+    Tries to get under MAX_BYTES, but will return best attempt even if over
+    method is the WebP effort level (0 = fastest, 6 = smallest output)
+    Returns a spooled temp file positioned at 0
+    """
+    # Cap extreme dimensions (max 5000px width)
+    im = open_image_for_encode(src_file, max_w=5000)
     
-    # Convert to RGB
-    if im.mode in ('RGBA', 'LA', 'P'):
-        background = Image.new('RGB', im.size, (255, 255, 255))
-        if im.mode == 'P':
-            im = im.convert('RGBA')
-        if im.mode in ('RGBA', 'LA'):
-            background.paste(im, mask=im.split()[-1])
-        im = background
-    elif im.mode != 'RGB':
-        im = im.convert('RGB')
+    # Perceptual mode: lowest quality that still looks the same as the source
+    if getattr(settings, 'IMAGE_ENCODE_MODE', 'bytes') == 'perceptual':
+        encoded = encode_webp_perceptual(im, method=method)
+        if encoded is not None:
+            return encoded
     
-    # Very aggressive quality reduction
-    q = 60  # Start lower
-    min_q = 30  # Very low minimum
-    step = 5  # Larger steps
+    # Iterative quality reduction: 85 down to 40 in steps of 3
+    return encode_webp_ladder(im, range(85, 39, -3), method=method)
+
+
+def aggressive_compress_to_file(src_file, method=6):
+    """
+    More aggressive compression - reduces dimensions further and uses lower quality
+    Used as fallback if smart_compress still results in file over 10MB
+    Returns a spooled temp file positioned at 0
+    """
+    # More aggressive dimension capping (max 3000px width)
+    im = open_image_for_encode(src_file, max_w=3000)
     
-    best_data = None
-    best_size = float('inf')
+    # Very aggressive quality reduction: 60 down to 30 in steps of 5
+    return encode_webp_ladder(im, range(60, 29, -5), method=method)
+
+
+def allocate_public_id(folder: str, base_public_id: str) -> str:
+    """
+    Pick the next free public_id for a filename slug in a single query.
+    Returns base_public_id if unused, otherwise base_public_id-N with N one past
+    the highest suffix already taken. Not a reservation - callers must still
+    handle losing a race (see upload_image).
+    """
+    prefix = f"{folder}/{base_public_id}"
+    taken = MediaAsset.objects.filter(public_id__startswith=prefix).values_list('public_id', flat=True)
     
-    while q >= min_q:
-        buf = io.BytesIO()
-        try:
-            im.save(buf, format="WEBP", quality=q, method=6)
-            data = buf.getvalue()
-            
-            if len(data) < best_size:
-                best_size = len(data)
-                best_data = data
-            
-            if len(data) <= MAX_BYTES:
-                return data
-            
-        except Exception:
-            pass
-        
-        q = max(min_q, q - step)
+    suffixes = set()
+    for existing_id in taken:
+        rest = existing_id[len(prefix):]
+        if rest == '':
+            suffixes.add(0)
+        elif rest.startswith('-') and rest[1:].isdigit():
+            suffixes.add(int(rest[1:]))
     
-    return best_data if best_data is not None else im.tobytes()
+    if 0 not in suffixes:
+        return base_public_id
+    return f"{base_public_id}-{max(suffixes) + 1}"
 
 
-def upload_to_cloudinary(file_bytes: bytes, folder: str, public_id: str, tags=None):
+def media_asset_upload_payload(asset, deduplicated=False):
+    """JSON payload returned by upload_image for a stored MediaAsset"""
+    return {
+        "success": True,
+        "id": asset.id,
+        "title": asset.title,
+        "secure_url": asset.secure_url,
+        "web_url": asset.web_url,
+        "thumb_url": asset.thumb_url,
+        "public_id": asset.public_id,
+        "width": asset.width,
+        "height": asset.height,
+        "format": asset.format,
+        "bytes": asset.bytes_size,
+        "placeholder": asset.placeholder,
+        "dominant_color": asset.dominant_color,
+        "aspect_ratio": asset.aspect_ratio,
+        "eager_ready": asset.eager_ready,
+        "eager_url": asset.eager_url,
+        "deduplicated": deduplicated,
+    }
+
+
+def similar_assets_payload(asset, limit=5):
     """
-    Upload to Cloudinary with optimization settings
-    Returns: (result_dict, web_url, thumb_url)
+    Other active assets with the same perceptual hash, as a hint for the editor
+    (possibly the same picture at another size or in another colour).
+    Featureless hashes - flat colours, plain gradients - are too common to mean anything.
     """
-    result = cloudinary.uploader.upload(
-        file=io.BytesIO(file_bytes),
-        resource_type="image",
-        folder=folder or "insight-seeker/uploads",
-        public_id=public_id,
-        overwrite=True,
-        unique_filename=False,
-        use_filename=False,
-        access_mode="public",  # CRITICAL: Public access
-        eager=[{
-            "format": "webp",
-            "quality": "auto",
-            "fetch_format": "auto",
-            "crop": "limit",
-            "width": 2400
-        }],
-        tags=(tags or []),
-        timeout=120,
+    if not asset.perceptual_hash or asset.perceptual_hash in FEATURELESS_HASHES:
+        return []
+    similar = (
+        MediaAsset.objects.filter(is_active=True, perceptual_hash=asset.perceptual_hash)
+        .exclude(id=asset.id).order_by('-created_at')
+        .values('id', 'title', 'thumb_url', 'width', 'height')[:limit]
     )
-    
-    # Generate URL variants
-    secure_url = result.get("secure_url", "")
-    
-    # Web-optimized variant
-    if "/upload/" in secure_url:
-        web_url = secure_url.replace("/upload/", "/upload/f_auto,q_auto/")
-        thumb_url = secure_url.replace("/upload/", "/upload/c_fill,g_face,w_480,h_320/")
-    else:
-        web_url = secure_url
-        thumb_url = secure_url
-    
-    return result, web_url, thumb_url
+    return list(similar)
 
 
 @login_required
 @require_http_methods(["POST"])
 def upload_image(request):
-    """Upload image to Cloudinary - complete logic with compression and MediaAsset storage"""
+    """Upload image to media storage - complete logic with compression and MediaAsset storage"""
+    encoded = None  # Spooled temp file holding the compressed WebP
     try:
         # Get file (support both 'image' and 'file' field names)
         image_file = request.FILES.get('image') or request.FILES.get('file')
@@ -731,146 +824,262 @@ def upload_image(request):
         tags_str = request.POST.get('tags', '')
         tags = [t.strip() for t in tags_str.split(',') if t.strip()] if tags_str else []
         
+        fast_method = getattr(settings, 'IMAGE_FAST_WEBP_METHOD', 6)
+        best_method = getattr(settings, 'IMAGE_BEST_WEBP_METHOD', 6)
+        
+        # Exact duplicate of an existing upload? Return it without any encode or network
+        source_sha256 = content_sha256(image_file)
+        existing = MediaAsset.objects.filter(is_active=True, content_sha256=source_sha256).first()
+        if existing:
+            return JsonResponse(media_asset_upload_payload(existing, deduplicated=True))
+        
         # Always compress to WebP - accept any input size since we're converting anyway
         # Only validate the final compressed size
+        # Compression is CPU-heavy, so it runs behind the process-wide admission gate
         try:
-            file_bytes = smart_compress_to_bytes(image_file)
-            
-            # After compression, check if still over limit
-            if len(file_bytes) > MAX_BYTES:
-                # Try more aggressive compression
-                file_bytes = aggressive_compress_to_bytes(image_file)
-                
-                # Final check - if still too large, reject
-                if len(file_bytes) > MAX_BYTES:
-                    return JsonResponse({
-                        'success': False, 
-                        'error': f'Image is too large even after compression ({len(file_bytes) / (1024*1024):.1f}MB). Maximum allowed is 10MB. Please use a smaller or less complex image.'
-                    })
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': f'Image processing error: {str(e)}'})
+            with get_compression_gate().slot() as queue_wait:
+                try:
+                    # Stored and used to point out look-alikes, never to reuse an asset:
+                    # dHash ignores colour and resolution
+                    source_phash = perceptual_hash(image_file)
+                    
+                    # LQIP, dominant colour and aspect ratio for instant placeholders
+                    placeholder = placeholder_metadata(image_file)
+                    
+                    # Fast effort level here; a background task re-encodes at best effort
+                    encoded = smart_compress_to_file(image_file, method=fast_method)
+                    
+                    # After compression, check if still over limit
+                    if file_size(encoded) > MAX_BYTES:
+                        # Try more aggressive compression
+                        encoded.close()
+                        encoded = aggressive_compress_to_file(image_file, method=fast_method)
+                        
+                        # Final check - if still too large, reject
+                        if file_size(encoded) > MAX_BYTES:
+                            return JsonResponse({
+                                'success': False, 
+                                'error': f'Image is too large even after compression ({file_size(encoded) / (1024*1024):.1f}MB). Maximum allowed is 10MB. Please use a smaller or less complex image.'
+                            })
+                except Exception as e:
+                    return JsonResponse({'success': False, 'error': f'Image processing error: {str(e)}'})
+        except AdmissionRejected as e:
+            response = JsonResponse({
+                'success': False,
+                'error': 'The server is busy processing other uploads. Please try again in a few seconds.',
+                'retry_after': e.retry_after,
+            }, status=503)
+            response['Retry-After'] = str(e.retry_after)
+            return response
         
         # Generate public_id from filename
         filename = image_file.name.rsplit('.', 1)[0]  # Remove extension
-        public_id = slugify(filename)
+        base_public_id = slugify(filename) or 'image'
+        public_id = allocate_public_id(folder, base_public_id)
         
-        # Ensure unique public_id
-        base_public_id = public_id
-        counter = 1
-        while MediaAsset.objects.filter(public_id=f"{folder}/{public_id}").exists():
-            public_id = f"{base_public_id}-{counter}"
-            counter += 1
+        # Upload without overwriting and rely on the unique public_id constraint.
+        # If a concurrent upload took the name first, retry with a suffix derived
+        # from this file's content hash, which can't collide with different content.
+        asset = None
+        for attempt in range(PUBLIC_ID_ATTEMPTS):
+            if attempt > 0:
+                public_id = f"{base_public_id}-{source_sha256[:8 * attempt]}"
+            
+            # Upload to the configured storage backend
+            try:
+                result, web_url, thumb_url = get_storage_backend().upload(
+                    file_obj=encoded,
+                    folder=folder,
+                    public_id=public_id,
+                    tags=tags,
+                    overwrite=False,
+                )
+            except Exception as e:
+                return JsonResponse({'success': False, 'error': f'Storage upload error: {str(e)}'})
+            
+            if result.get("existing"):
+                continue  # Name already taken remotely - nothing was overwritten
+            
+            # Store in database
+            try:
+                with transaction.atomic():
+                    asset = MediaAsset.objects.create(
+                        title=image_file.name,
+                        slug=media_asset_slug(result.get("public_id", "")),
+                        public_id=result.get("public_id"),
+                        secure_url=result.get("secure_url", ""),
+                        web_url=web_url,
+                        thumb_url=thumb_url,
+                        bytes_size=result.get("bytes", 0),
+                        width=result.get("width", 0),
+                        height=result.get("height", 0),
+                        format=result.get("format", ""),
+                        tags_csv=",".join(tags) if tags else "",
+                        content_sha256=source_sha256,
+                        perceptual_hash=source_phash,
+                        placeholder=placeholder['placeholder'],
+                        dominant_color=placeholder['dominant_color'],
+                        aspect_ratio=placeholder['aspect_ratio'],
+                        **eager_variant_fields(result),
+                    )
+                    save_asset_tags({asset.id: tags})
+                break
+            except IntegrityError:
+                continue  # Lost the race for this public_id
+            except Exception as e:
+                return JsonResponse({'success': False, 'error': f'Database error: {str(e)}'})
         
-        # Upload to Cloudinary
-        try:
-            result, web_url, thumb_url = upload_to_cloudinary(
-                file_bytes=file_bytes,
-                folder=folder,
-                public_id=public_id,
-                tags=tags
-            )
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': f'Cloudinary upload error: {str(e)}'})
+        if asset is None:
+            return JsonResponse({'success': False, 'error': 'Could not allocate a unique name for this image. Please rename the file and try again.'})
         
-        # Store in database
-        try:
-            asset = MediaAsset.objects.create(
-                title=image_file.name,
-                public_id=result.get("public_id"),
-                secure_url=result.get("secure_url", ""),
-                web_url=web_url,
-                thumb_url=thumb_url,
-                bytes_size=result.get("bytes", 0),
-                width=result.get("width", 0),
-                height=result.get("height", 0),
-                format=result.get("format", ""),
-                tags_csv=",".join(tags) if tags else "",
-            )
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': f'Database error: {str(e)}'})
+        # Phase two: shrink the asset further in the background at the slow effort level
+        if best_method > fast_method:
+            schedule_best_effort_reencode(asset, image_file, method=best_method)
         
         # Return JSON response
-        return JsonResponse({
-            "success": True,
-            "id": asset.id,
-            "title": asset.title,
-            "secure_url": asset.secure_url,
-            "web_url": asset.web_url,
-            "thumb_url": asset.thumb_url,
-            "public_id": asset.public_id,
-            "width": asset.width,
-            "height": asset.height,
-            "format": asset.format,
-            "bytes": asset.bytes_size
-        })
+        payload = media_asset_upload_payload(asset)
+        payload["similar"] = similar_assets_payload(asset)
+        payload["queue_wait_ms"] = round(queue_wait * 1000, 1)
+        response = JsonResponse(payload)
+        # Expose compression queue wait time to browser devtools / APM
+        response['Server-Timing'] = f'queue;dur={queue_wait * 1000:.1f};desc="Compression queue"'
+        return response
             
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
+    finally:
+        if encoded is not None:
+            encoded.close()
+
+
+@login_required
+def compression_stats(request):
+    """Compression admission gate metrics (active, waiting, rejected, queue wait) and Cloudinary connection reuse"""
+    return JsonResponse({
+        'success': True,
+        'stats': get_compression_gate().stats(),
+        'transport': transport_stats(),
+    })
+
+
+@login_required
+def media_search(request):
+    """Ranked, prefix-matching search over media titles, public_ids and tags (?q=...&limit=...)"""
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit') or 20), 1), 100)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid limit', 'images': []}, status=400)
+    
+    try:
+        images = search_assets(query, limit=limit)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e), 'images': []})
+    
+    return JsonResponse({'success': True, 'query': query, 'images': images})
+
+
+@login_required
+def media_usage(request, asset_id):
+    """Where a MediaAsset is used: one entry per section config field that references it"""
+    asset = get_object_or_404(MediaAsset, id=asset_id)
+    usages = MediaUsage.objects.filter(asset=asset).select_related('section__page').order_by('section__page__name', 'section__sort_order')
+    
+    return JsonResponse({
+        'success': True,
+        'asset_id': asset.id,
+        'public_id': asset.public_id,
+        'usage_count': len({usage.section_id for usage in usages}),
+        'usages': [{
+            'section_id': usage.section_id,
+            'section_type': usage.section.section_type,
+            'internal_label': usage.section.internal_label,
+            'page': usage.section.page.name,
+            'config_kind': usage.config_kind,
+            'field_path': usage.field_path,
+        } for usage in usages],
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def cloudinary_notification(request):
+    """
+    Cloudinary notification webhook (eager_notification_url).
+    Marks the asset's asynchronous eager variant as ready and stores its URL and size.
+    Requests are authenticated by Cloudinary's X-Cld-Signature unless
+    CLOUDINARY_VERIFY_NOTIFICATIONS is off (local testing with canned payloads).
+    """
+    body = request.body.decode('utf-8', errors='replace')
+    
+    if getattr(settings, 'CLOUDINARY_VERIFY_NOTIFICATIONS', True):
+        try:
+            valid = cloudinary.utils.verify_notification_signature(
+                body,
+                int(request.headers.get('X-Cld-Timestamp', '')),
+                request.headers.get('X-Cld-Signature', ''),
+            )
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            return JsonResponse({'success': False, 'error': 'Invalid notification signature'}, status=403)
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    
+    if payload.get('notification_type') != 'eager':
+        return JsonResponse({'success': True, 'updated': 0})
+    
+    updated = MediaAsset.objects.filter(public_id=payload.get('public_id', '')).update(
+        updated_at=timezone.now(),
+        **eager_variant_fields(payload),
+    )
+    if updated:
+        invalidate_gallery_cache()
+    return JsonResponse({'success': True, 'updated': updated})
 
 
 @login_required
 def gallery_images(request):
-    """Get list of images from MediaAsset database (preferred) or Cloudinary fallback"""
+    """
+    One page of the media gallery from MediaAsset.
+    ?cursor=<next_cursor from the previous page>&limit=<page size, capped at 100>
+    &tags=a,b&tag_mode=all|any to filter by tags (all: every tag, any: at least one)
+    Images stored outside the dashboard are picked up by the sync_cloudinary_media command,
+    so this never calls the storage backend.
+    """
     try:
-        # Try to get from database first (faster and includes all metadata)
-        assets = MediaAsset.objects.filter(is_active=True).order_by('-created_at')[:100]
+        try:
+            page_size = min(max(int(request.GET.get('limit') or getattr(settings, 'GALLERY_PAGE_SIZE', 48)), 1), 100)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid limit', 'images': []}, status=400)
+        cursor = request.GET.get('cursor') or None
+        tags = [t for t in request.GET.get('tags', '').split(',') if t.strip()]
+        tag_mode = request.GET.get('tag_mode', 'all')
         
-        if assets.exists():
-            images = []
-            for asset in assets:
-                images.append({
-                    'id': asset.id,
-                    'url': asset.web_url,  # Use optimized web_url
-                    'thumbnail': asset.thumb_url,  # Use thumbnail URL
-                    'secure_url': asset.secure_url,
-                    'public_id': asset.public_id,
-                    'format': asset.format,
-                    'bytes': asset.bytes_size,
-                    'width': asset.width,
-                    'height': asset.height,
-                    'title': asset.title
-                })
-            
-            return JsonResponse({
-                'success': True,
-                'images': images
-            })
-        else:
-            # Fallback to Cloudinary API if no database records
-            result = cloudinary.api.resources(
-                type="upload",
-                prefix="insight-seeker/",
-                max_results=100,
-                resource_type="image"
-            )
-            
-            images = []
-            for resource in result.get('resources', []):
-                secure_url = resource.get('secure_url') or resource.get('url')
-                # Generate variants
-                if "/upload/" in secure_url:
-                    web_url = secure_url.replace("/upload/", "/upload/f_auto,q_auto/")
-                    thumb_url = secure_url.replace("/upload/", "/upload/c_fill,g_face,w_480,h_320/")
-                else:
-                    web_url = secure_url
-                    thumb_url = secure_url
-                
-                images.append({
-                    'url': web_url,
-                    'thumbnail': thumb_url,
-                    'secure_url': secure_url,
-                    'public_id': resource.get('public_id'),
-                    'format': resource.get('format'),
-                    'bytes': resource.get('bytes'),
-                    'width': resource.get('width', 0),
-                    'height': resource.get('height', 0),
-                    'title': resource.get('public_id', '').split('/')[-1]
-                })
-            
-            return JsonResponse({
-                'success': True,
-                'images': images
-            })
+        # Pages only change when the cache version does - let the browser revalidate cheaply
+        version = gallery_cache_version()
+        etag = f'"gallery-{version}-{cursor or ""}-{page_size}-{tag_mode}-{slugify(",".join(tags))}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        
+        try:
+            page = gallery_page(cursor=cursor, page_size=page_size, tags=tags, tag_mode=tag_mode, version=version)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e), 'images': []}, status=400)
+        
+        response = JsonResponse({
+            'success': True,
+            'images': page['images'],
+            'next_cursor': page['next_cursor'],
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         return JsonResponse({
             'success': False,
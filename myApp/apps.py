@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myApp'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.models.signals import post_delete, post_save
+        from .checks import check_static_references
+        from .media_usage import section_saved
+        from .models import MediaAsset, Page, Section
+        from .page_cache import invalidate_page_cache
+
+        post_save.connect(section_saved, sender=Section, dispatch_uid='media-usage-section-save')
+        # Anything a public page renders from: a new version means re-render on next request
+        for model in (Page, Section, MediaAsset):
+            post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page-cache-save-{model.__name__}')
+            post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page-cache-delete-{model.__name__}')
+
+        checks.register(check_static_references, checks.Tags.staticfiles)
@@ -0,0 +1,110 @@
+"""
+Edge caching for public pages: the Cache-Control / Surrogate-Key headers they
+are sent with, and purging them from the CDN when the published site changes.
+
+Public pages go out with a long s-maxage, so each edge fetches a page from
+the origin once and keeps serving it until the dashboard purges it (publish,
+toggle, move, add, delete). Browsers get max-age=PAGE_BROWSER_MAX_AGE and
+revalidate against the edge, not the origin.
+
+CDN_PURGE_BACKEND selects how purges are issued:
+- LocalPurgeBackend (default): no CDN; purges are logged and kept in memory so
+  tests and local runs can assert on them
+- FastlyPurgeBackend: surrogate-key purge through the Fastly API
+"""
+import logging
+from collections import deque
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Every public page carries this key too, so one purge can clear the whole site
+SITE_SURROGATE_KEY = 'pages'
+
+
+def surrogate_keys(slug):
+    """Surrogate keys for the public page slug"""
+    return [SITE_SURROGATE_KEY, f'page-{slug}']
+
+
+def public_cache_control():
+    """Cache-Control value for public pages, built from the PAGE_* cache settings"""
+    directives = ['public', f"max-age={getattr(settings, 'PAGE_BROWSER_MAX_AGE', 0)}"]
+    s_maxage = getattr(settings, 'PAGE_EDGE_MAX_AGE', 86400)
+    if s_maxage:
+        directives.append(f's-maxage={s_maxage}')
+    stale = getattr(settings, 'PAGE_STALE_WHILE_REVALIDATE', 60)
+    if stale:
+        directives.append(f'stale-while-revalidate={stale}')
+    return ', '.join(directives)
+
+
+class CDNPurgeBackend:
+    """Interface shared by all CDN purge backends"""
+
+    def purge(self, keys):
+        """Purge every cached object tagged with any of keys (list of surrogate keys)"""
+        raise NotImplementedError
+
+
+class LocalPurgeBackend(CDNPurgeBackend):
+    """No CDN in front of the site: purges are only logged and remembered (most recent first)"""
+
+    def __init__(self, history=100):
+        self.purged = deque(maxlen=history)
+
+    def purge(self, keys):
+        logger.info('CDN purge (local, nothing sent): %s', ' '.join(keys))
+        self.purged.appendleft(list(keys))
+
+
+class FastlyPurgeBackend(CDNPurgeBackend):
+    """Surrogate-key purge for one Fastly service (CDN_PURGE_SERVICE_ID / CDN_PURGE_API_TOKEN)"""
+
+    API_URL = 'https://api.fastly.com/service/{service_id}/purge'
+
+    def __init__(self, service_id=None, api_token=None, soft=None):
+        self.service_id = service_id or getattr(settings, 'CDN_PURGE_SERVICE_ID', '')
+        self.api_token = api_token or getattr(settings, 'CDN_PURGE_API_TOKEN', '')
+        # Soft purge marks objects stale instead of dropping them, so stale-while-revalidate still applies
+        self.soft = getattr(settings, 'CDN_PURGE_SOFT', True) if soft is None else soft
+
+    def purge(self, keys):
+        headers = {'Fastly-Key': self.api_token, 'Surrogate-Key': ' '.join(keys), 'Accept': 'application/json'}
+        if self.soft:
+            headers['Fastly-Soft-Purge'] = '1'
+        response = requests.post(
+            self.API_URL.format(service_id=self.service_id),
+            headers=headers,
+            timeout=getattr(settings, 'CDN_PURGE_TIMEOUT', 10),
+        )
+        response.raise_for_status()
+
+
+@lru_cache(maxsize=None)
+def get_purge_backend():
+    """Return the process-wide purge backend selected by CDN_PURGE_BACKEND"""
+    backend_path = getattr(settings, 'CDN_PURGE_BACKEND', 'myApp.cdn.LocalPurgeBackend')
+    return import_string(backend_path)()
+
+
+def purge_keys(keys):
+    """Purge keys once the current transaction commits; a failed purge is logged, not raised"""
+    def _purge():
+        try:
+            get_purge_backend().purge(keys)
+        except Exception as e:
+            # The edge copy then lives until s-maxage runs out - don't fail the dashboard action over it
+            logger.warning('CDN purge of %s failed: %s', ' '.join(keys), e)
+
+    transaction.on_commit(_purge)
+
+
+def purge_page(page):
+    """Purge the public page from the CDN after a change to what it shows"""
+    purge_keys([f'page-{page.slug}'])
@@ -0,0 +1,56 @@
+"""
+System check that every {% static '...' %} reference in the project's own
+templates resolves to a file the staticfiles finders can see.
+
+With CompressedManifestStaticFilesStorage an unresolvable name isn't just a
+404: once DEBUG is off {% static %} raises for anything missing from the
+manifest, so the page errors. Catching it at startup keeps that out of
+production. Only literal names are checked ({% static some_var %} can't be).
+"""
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core import checks
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+STATIC_TAG_RE = re.compile(r"""\{%\s*static\s+(['"])(?P<path>[^'"]+)\1""")
+
+
+def project_template_files():
+    """Template files under BASE_DIR (Django's and third-party apps' templates are left out)"""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    seen = set()
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for template_dir in engine.template_dirs:
+            template_dir = Path(template_dir).resolve()
+            if not template_dir.is_dir() or not template_dir.is_relative_to(base_dir):
+                continue
+            for path in template_dir.rglob('*.html'):
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+
+
+def check_static_references(app_configs=None, **kwargs):
+    errors = []
+    for path in project_template_files():
+        try:
+            source = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            continue
+        for match in STATIC_TAG_RE.finditer(source):
+            name = match.group('path')
+            if finders.find(name) is None:
+                line = source.count('\n', 0, match.start()) + 1
+                errors.append(checks.Error(
+                    f"{path.relative_to(settings.BASE_DIR)}:{line} references static file '{name}', "
+                    'which no staticfiles finder can locate.',
+                    hint='Fix the path or add the file to an app static/ directory or STATICFILES_DIRS.',
+                    id='myApp.E001',
+                ))
+    return errors
@@ -0,0 +1,95 @@
+"""
+LCP (Largest Contentful Paint) preload hints for published pages.
+
+The first visible section of a page almost always holds its LCP element - the
+hero background or a two-column image. Whenever the published state changes
+(publish, toggle, move, delete) the dashboard calls refresh_lcp_hints(), which
+works out that image and stores the <link rel="preload"> attributes on
+Page.lcp_hints. base.html emits the link and home() marks the image
+fetchpriority="high", so rendering it costs nothing per request. Stored hints
+carry LCP_HINTS_VERSION; render_home() recomputes ones from an older version.
+"""
+from django.db.models import Q
+
+from .models import MediaAsset
+from .responsive import TWO_COLUMN_SIZES, image_sources
+
+# Bump when the hints computed for the same page change (e.g. image URL rewriting) so stored ones are redone
+LCP_HINTS_VERSION = 2
+
+# Section types whose image is rendered above the text columns, and the layout that shows it
+IMAGE_LAYOUTS = {
+    'hero': 'text_left_image_right',
+    'credibility': 'two_column_text_image',
+    'meet_kim': 'two_column_text_image',
+    'free_resource': 'two_column_text_image',
+}
+
+
+# Section types in the order home.html renders them (it does not follow sort_order)
+RENDER_ORDER = (
+    'hero', 'statistics', 'credibility', 'testimonials', 'pain_points', 'what_makes_me_different',
+    'featured_publications', 'services', 'meet_kim', 'mission', 'free_resource', 'footer',
+)
+
+
+def first_visible_section(page):
+    """(section, published config) of the first section the public page renders, or (None, None)"""
+    # Same pick as home(): the last section of each type wins, except the first footer
+    rendered = {}
+    for section in page.sections.filter(is_enabled=True).order_by('sort_order'):
+        config = section.get_config_for_preview(preview_mode=False)
+        if not config or not isinstance(config, dict):
+            continue
+        if section.section_type != 'footer' or 'footer' not in rendered:
+            rendered[section.section_type] = (section, config)
+
+    for section_type in RENDER_ORDER:
+        section, config = rendered.get(section_type, (None, None))
+        if section is not None and config.get('show_section', True):
+            return section, config
+    return None, None
+
+
+def intrinsic_width(url):
+    """Stored width of the MediaAsset behind url, 0 if unknown"""
+    row = MediaAsset.objects.filter(Q(web_url=url) | Q(secure_url=url)).values_list('width', flat=True).first()
+    return row or 0
+
+
+def compute_lcp_hints(page):
+    """Versioned preload attributes for the page's likely LCP image (no href if it doesn't start with one)"""
+    return {'version': LCP_HINTS_VERSION, **_lcp_image_hints(page)}
+
+
+def _lcp_image_hints(page):
+    section, config = first_visible_section(page)
+    if section is None:
+        return {}
+
+    background = config.get('background_image')
+    background_url = background.get('url', '') if isinstance(background, dict) else ''
+    if section.section_type == 'hero' and background_url:
+        # CSS background: preload the exact URL the stylesheet requests
+        return {'section_id': section.id, 'kind': 'background', 'href': background_url}
+
+    image = config.get('image')
+    image_url = image.get('url', '') if isinstance(image, dict) else ''
+    layout = IMAGE_LAYOUTS.get(section.section_type)
+    if not image_url or not layout or config.get('layout_variant', '') != layout:
+        return {}
+
+    src, srcset = image_sources(image_url, intrinsic_width=intrinsic_width(image_url))
+    hints = {'section_id': section.id, 'kind': 'image', 'href': src}
+    if srcset:
+        hints.update(imagesrcset=srcset, imagesizes=TWO_COLUMN_SIZES)
+    return hints
+
+
+def refresh_lcp_hints(page):
+    """Recompute and store page.lcp_hints (only written when they changed)"""
+    hints = compute_lcp_hints(page)
+    if hints != page.lcp_hints:
+        page.lcp_hints = hints
+        page.save(update_fields=['lcp_hints'])
+    return hints
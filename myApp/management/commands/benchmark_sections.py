@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+from myApp.models import Page
+from myApp.views import attach_media_metadata, convert_section_config_to_template_format
+
+# section_type -> (partial, context variable home.html passes it as)
+SECTION_TEMPLATES = {
+    'hero': ('sections/_hero_section.html', 'hero_section'),
+    'statistics': ('sections/_statistics_section.html', 'statistics_section'),
+    'credibility': ('sections/_credibility_section.html', 'credibility_section'),
+    'testimonials': ('sections/_testimonials_section.html', 'testimonials_section'),
+    'pain_points': ('sections/_pain_points_solutions_section.html', 'pain_points_section'),
+    'what_makes_me_different': ('sections/_what_makes_me_different_section.html', 'different_section'),
+    'featured_publications': ('sections/_featured_publications_section.html', 'publications_section'),
+    'services': ('sections/_services_section.html', 'services_section'),
+    'meet_kim': ('sections/_meet_kim_herrlein_section.html', 'meet_kim_section'),
+    'mission': ('sections/_mission_section.html', 'mission_section'),
+    'free_resource': ('sections/_free_resource_section.html', 'free_resource_section'),
+    'footer': ('sections/_footer_section.html', 'footer_section'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time how long each section partial of a page takes to render from its published config. '
+        'Run before and after a template change to compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', default='home', help='Slug of the page whose sections are rendered')
+        parser.add_argument('--iterations', type=int, default=500, help='Renders per timing run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs per section; the fastest is reported')
+
+    def handle(self, *args, **options):
+        page = Page.objects.filter(slug=options['page']).first()
+        if page is None:
+            raise CommandError(f'No page with slug "{options["page"]}"')
+        iterations = options['iterations']
+        repeat = options['repeat']
+        if iterations < 1 or repeat < 1:
+            raise CommandError('--iterations and --repeat must be at least 1')
+
+        sections = []
+        for section in page.sections.filter(is_enabled=True).order_by('sort_order'):
+            config = section.get_config_for_preview(preview_mode=False)
+            if section.section_type in SECTION_TEMPLATES and config:
+                sections.append((section, convert_section_config_to_template_format(section, config=config)))
+        if not sections:
+            raise CommandError('Page has no renderable sections')
+        attach_media_metadata([obj for _, obj in sections])
+
+        total = 0.0
+        for section, obj in sections:
+            template_name, var_name = SECTION_TEMPLATES[section.section_type]
+            template = get_template(template_name)
+            context = {var_name: obj}
+            template.render(context)  # warm the loader and any lazy lookups
+
+            # Best of several runs - the minimum is the least noisy estimate
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    template.render(context)
+                timings.append((time.perf_counter() - start) / iterations)
+            per_render = min(timings)
+            total += per_render
+            self.stdout.write(f'  {section.section_type:<26} {per_render * 1e6:9.1f} µs/render')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(sections)} sections, {total * 1e6:.1f} µs per full page of partials (best of {repeat} x {iterations})'
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.upload_standin import UploadStandIn
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local stand-in for the Cloudinary upload API that fails a share of requests, '
+        'to exercise chunked upload retry/resume. Start the site with '
+        'CLOUDINARY_UPLOAD_PREFIX=<printed url> to send uploads to it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument('--fail-rate', type=float, default=0.2, help='Fraction of requests to fail (0-1)')
+        parser.add_argument('--drop', action='store_true', help='Fail by dropping the connection instead of answering 502')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['fail_rate'] <= 1:
+            raise CommandError('--fail-rate must be between 0 and 1')
+        standin = UploadStandIn(
+            port=options['port'],
+            fail_rate=options['fail_rate'],
+            fail_status=None if options['drop'] else 502,
+        ).start()
+        self.stdout.write(self.style.SUCCESS(f'Upload stand-in listening on {standin.url}'))
+        self.stdout.write(f'  CLOUDINARY_UPLOAD_PREFIX={standin.url}')
+
+        reported = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                for record in standin.requests[reported:]:
+                    self.stdout.write(f"  {record['range'] or 'single request':<28} -> {record['status'] or 'dropped'}")
+                reported = len(standin.requests)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            standin.stop()
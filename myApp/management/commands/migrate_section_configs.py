@@ -32,7 +32,8 @@ class Command(BaseCommand):
                 # Migrate section_config to both draft and published
                 section.draft_config = copy.deepcopy(section.section_config)
                 section.published_config = copy.deepcopy(section.section_config)
-                section.save(update_fields=['draft_config', 'published_config'])
+                section.refresh_render_hints()
+                section.save(update_fields=['draft_config', 'published_config', 'render_hints'])
                 migrated_count += 1
                 self.stdout.write(self.style.SUCCESS(f'  ✓ Migrated: {section.page.name} - {section.get_section_type_display()} ({section.internal_label})'))
             elif not has_section_config and (draft_is_empty and published_is_empty):
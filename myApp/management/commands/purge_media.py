@@ -0,0 +1,108 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.gallery import invalidate_gallery_cache
+from dashboard.search import remove_assets
+from dashboard.storage import get_storage_backend
+from myApp.media_usage import rebuild_all_usage
+from myApp.models import MediaAsset, MediaAssetTag, MediaUsage
+from myApp.page_cache import invalidate_page_cache
+
+MAX_BATCH_SIZE = 100  # Cloudinary delete_resources accepts at most 100 public_ids per call
+
+
+def delete_assets(asset_ids):
+    """
+    Hard-delete MediaAsset rows in a fixed number of queries. A queryset delete()
+    would load every row and run the post_delete receivers one by one (search row,
+    gallery and page cache versions); their work is done here once for the batch.
+    """
+    with transaction.atomic():
+        MediaAssetTag.objects.filter(asset_id__in=asset_ids).delete()
+        MediaUsage.objects.filter(asset_id__in=asset_ids).delete()
+        MediaAsset.objects.filter(id__in=asset_ids)._raw_delete(MediaAsset.objects.db)
+        remove_assets(asset_ids)
+    invalidate_gallery_cache()
+    invalidate_page_cache()
+
+
+class Command(BaseCommand):
+    help = (
+        'Permanently remove soft-deleted (is_active=False) media that no section references: '
+        'deletes originals and derived images from storage in batches, then deletes the rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List what would be purged without deleting anything')
+        parser.add_argument('--min-age-days', type=int, default=7, help='Only purge assets last updated at least this many days ago')
+        parser.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE, help=f'public_ids per delete call (max {MAX_BATCH_SIZE})')
+        parser.add_argument('--retries', type=int, default=3, help='Retries per batch on storage errors (exponential backoff)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise CommandError(f'--batch-size must be between 1 and {MAX_BATCH_SIZE}')
+
+        # MediaUsage is only rebuilt on Section save, so an asset row created after a section
+        # already pointed at its URL has no usage rows. Deleting from storage can't be undone -
+        # re-derive the index from the configs themselves before trusting it.
+        sections = rebuild_all_usage()
+        self.stdout.write(f'Rebuilt media usage for {sections} section(s)')
+
+        cutoff = timezone.now() - timedelta(days=options['min_age_days'])
+        candidates = list(
+            MediaAsset.objects.filter(is_active=False, updated_at__lte=cutoff, usages__isnull=True)
+            .order_by('id').values_list('id', 'public_id')
+        )
+        if not candidates:
+            self.stdout.write('Nothing to purge.')
+            return
+
+        if options['dry_run']:
+            for _, public_id in candidates:
+                self.stdout.write(f'  would purge {public_id}')
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(candidates)} asset(s) would be purged'))
+            return
+
+        backend = get_storage_backend()
+        purged = 0
+        failed = 0
+        for start in range(0, len(candidates), batch_size):
+            batch = dict((public_id, asset_id) for asset_id, public_id in candidates[start:start + batch_size])
+            result = self.delete_with_retry(backend, list(batch), options['retries'])
+            if result is None:
+                failed += len(batch)
+                continue
+
+            # "not_found" means storage no longer has it either - the row can go
+            statuses = result.get('deleted', {})
+            done_ids = {asset_id for public_id, asset_id in batch.items() if statuses.get(public_id) in ('deleted', 'not_found')}
+            failed += len(batch) - len(done_ids)
+            for public_id, asset_id in batch.items():
+                if asset_id not in done_ids:
+                    self.stderr.write(f'  {public_id}: {statuses.get(public_id, "no status returned")}')
+
+            if done_ids:
+                delete_assets(done_ids)
+                purged += len(done_ids)
+            self.stdout.write(f'  batch {start // batch_size + 1}: purged {len(done_ids)}/{len(batch)}')
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f'Purged {purged} asset(s), {failed} left for a later run'))
+
+    def delete_with_retry(self, backend, public_ids, retries):
+        """Delete one batch from storage, retrying with exponential backoff. Returns None if every attempt failed."""
+        for attempt in range(retries + 1):
+            try:
+                return backend.delete(public_ids, invalidate=True)
+            except Exception as e:
+                if attempt == retries:
+                    self.stderr.write(self.style.ERROR(f'  batch starting {public_ids[0]} failed: {e}'))
+                    return None
+                delay = 2 ** attempt
+                self.stderr.write(f'  delete failed ({e}), retrying in {delay}s')
+                time.sleep(delay)
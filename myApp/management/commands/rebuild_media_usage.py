@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from myApp.media_usage import rebuild_all_usage
+from myApp.models import MediaUsage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MediaUsage index (which section config fields reference which MediaAsset) from all sections'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding media usage index...')
+        sections = rebuild_all_usage()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {MediaUsage.objects.count()} media references across {sections} sections'
+        ))
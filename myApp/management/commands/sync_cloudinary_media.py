@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from dashboard.gallery import invalidate_gallery_cache, save_asset_tags
+from dashboard.search import index_assets
+from dashboard.storage import get_storage_backend
+from myApp.models import MediaAsset, MediaSyncState, media_asset_slug
+
+
+class Command(BaseCommand):
+    help = (
+        'Upsert images stored in Cloudinary (or the configured media storage backend) into MediaAsset. '
+        'Incremental: only images created since the last run are fetched unless --full is given. '
+        'Meant to run on a schedule, e.g. cron: */15 * * * * python manage.py sync_cloudinary_media'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='insight-seeker/', help='Only sync public_ids under this prefix')
+        parser.add_argument('--full', action='store_true', help='Ignore the stored high-water mark and walk everything')
+        parser.add_argument('--page-size', type=int, default=500, help='Resources per listing call (Cloudinary max is 500)')
+
+    def handle(self, *args, **options):
+        backend = get_storage_backend()
+        backend_path = getattr(settings, 'MEDIA_STORAGE_BACKEND', 'dashboard.storage.CloudinaryStorageBackend')
+        state, _ = MediaSyncState.objects.get_or_create(backend=backend_path)
+        since = None if options['full'] else state.synced_through
+
+        if since:
+            self.stdout.write(f'Syncing images created since {since.isoformat()}...')
+        else:
+            self.stdout.write('Syncing all images...')
+
+        synced_through = state.synced_through
+        total = 0
+        pages = 0
+        next_cursor = None
+        while True:
+            page = backend.list_resources(
+                prefix=options['prefix'],
+                max_results=options['page_size'],
+                next_cursor=next_cursor,
+                since=since,
+            )
+            pages += 1
+
+            assets = []
+            remote_created = {}  # public_id -> upload time reported by storage
+            for resource in page['resources']:
+                secure_url = resource.get('secure_url') or resource.get('url', '')
+                web_url, thumb_url = backend.variant_urls(secure_url)
+                public_id = resource['public_id']
+                assets.append(MediaAsset(
+                    title=public_id.split('/')[-1],
+                    slug=media_asset_slug(public_id),
+                    public_id=public_id,
+                    secure_url=secure_url,
+                    web_url=web_url,
+                    thumb_url=thumb_url,
+                    bytes_size=resource.get('bytes') or 0,
+                    width=resource.get('width') or 0,
+                    height=resource.get('height') or 0,
+                    format=resource.get('format') or '',
+                    tags_csv=','.join(resource.get('tags') or []),
+                ))
+                created_at = parse_datetime(resource.get('created_at') or '')
+                if created_at:
+                    remote_created[public_id] = created_at
+                if created_at and (synced_through is None or created_at > synced_through):
+                    synced_through = created_at
+
+            if assets:
+                existing = set(MediaAsset.objects.filter(public_id__in=[a.public_id for a in assets]).values_list('public_id', flat=True))
+                # Insert new rows; refresh storage-owned fields on existing ones, keep editor-owned ones
+                MediaAsset.objects.bulk_create(
+                    assets,
+                    update_conflicts=True,
+                    unique_fields=['public_id'],
+                    update_fields=['secure_url', 'web_url', 'thumb_url', 'bytes_size', 'width', 'height', 'format'],
+                )
+                # auto_now_add stamped the new rows with the sync time; the gallery orders
+                # (and pages its cursors) by upload time, so take that from storage
+                inserted = {pid: at for pid, at in remote_created.items() if pid not in existing}
+                if inserted:
+                    MediaAsset.objects.filter(public_id__in=inserted).update(created_at=Case(
+                        *[When(public_id=pid, then=Value(at)) for pid, at in inserted.items()],
+                        output_field=DateTimeField(),
+                    ))
+                # Conflicting rows don't get their pk back on every backend - look ids up by public_id
+                ids = dict(MediaAsset.objects.filter(public_id__in=[a.public_id for a in assets]).values_list('public_id', 'id'))
+                save_asset_tags({ids[a.public_id]: a.tags_csv.split(',') for a in assets if a.tags_csv})
+                # bulk_create sends no signals, so index the page for search explicitly
+                index_assets(ids.values())
+                total += len(assets)
+
+            next_cursor = page.get('next_cursor')
+            if not next_cursor:
+                break
+
+        state.synced_through = synced_through
+        state.last_run_at = timezone.now()
+        state.save()
+        if total:
+            invalidate_gallery_cache()
+
+        self.stdout.write(self.style.SUCCESS(f'Synced {total} images in {pages} page(s)'))
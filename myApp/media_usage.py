@@ -0,0 +1,95 @@
+"""
+Maintains MediaUsage, the reverse index from MediaAsset to the section config fields that reference it.
+
+Every Section save rebuilds that section's rows (one lookup query, one delete,
+one bulk insert), so "where is this image used?" is an indexed query instead of
+a scan over every config blob.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MediaAsset, MediaUsage, Section
+
+CONFIG_FIELDS = (
+    ('draft', 'draft_config'),
+    ('published', 'published_config'),
+    ('legacy', 'section_config'),
+)
+
+
+def iter_url_fields(value, path=''):
+    """Yield (dotted_path, url) for every http(s) or /media/ string inside a config value"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from iter_url_fields(item, f'{path}.{key}' if path else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from iter_url_fields(item, f'{path}.{index}' if path else str(index))
+    elif isinstance(value, str) and value.startswith(('http://', 'https://', '/media/')):
+        yield path, value
+
+
+def resolve_assets(urls):
+    """Map each URL to a MediaAsset id - matches stored URL variants and storage public_ids, in one query"""
+    from dashboard.storage import get_storage_backend
+
+    urls = set(urls)
+    if not urls:
+        return {}
+    backend = get_storage_backend()
+    public_ids = {url: backend.public_id_from_url(url) for url in urls}
+
+    rows = MediaAsset.objects.filter(
+        Q(secure_url__in=urls) | Q(web_url__in=urls) | Q(thumb_url__in=urls) | Q(eager_url__in=urls)
+        | Q(public_id__in={pid for pid in public_ids.values() if pid})
+    ).values_list('id', 'public_id', 'secure_url', 'web_url', 'thumb_url', 'eager_url')
+
+    by_key = {}
+    for asset_id, public_id, *asset_urls in rows:
+        by_key[public_id] = asset_id
+        for url in asset_urls:
+            if url:
+                by_key[url] = asset_id
+
+    resolved = {}
+    for url in urls:
+        asset_id = by_key.get(url) or by_key.get(public_ids[url])
+        if asset_id:
+            resolved[url] = asset_id
+    return resolved
+
+
+def rebuild_section_usage(section):
+    """Replace the MediaUsage rows of one section from its current configs"""
+    refs = []
+    for kind, field in CONFIG_FIELDS:
+        config = getattr(section, field) or {}
+        refs.extend((kind, path, url) for path, url in iter_url_fields(config))
+
+    resolved = resolve_assets(url for _, _, url in refs)
+    usages = {
+        (resolved[url], kind, path[:255])
+        for kind, path, url in refs
+        if url in resolved
+    }
+    with transaction.atomic():
+        MediaUsage.objects.filter(section=section).delete()
+        MediaUsage.objects.bulk_create([
+            MediaUsage(asset_id=asset_id, section=section, config_kind=kind, field_path=path)
+            for asset_id, kind, path in usages
+        ])
+
+
+def rebuild_all_usage():
+    """Rebuild the whole index (backfill / repair). Returns the number of sections processed."""
+    count = 0
+    for section in Section.objects.only('id', 'draft_config', 'published_config', 'section_config').iterator():
+        rebuild_section_usage(section)
+        count += 1
+    return count
+
+
+def section_saved(sender, instance, raw=False, **kwargs):
+    """post_save receiver for Section (skipped for fixture loading)"""
+    if not raw:
+        rebuild_section_usage(instance)
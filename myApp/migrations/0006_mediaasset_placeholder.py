@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0005_mediaasset_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='aspect_ratio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='dominant_color',
+            field=models.CharField(blank=True, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='placeholder',
+            field=models.TextField(blank=True),
+        ),
+    ]
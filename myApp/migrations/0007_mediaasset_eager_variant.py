@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0006_mediaasset_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='eager_bytes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='eager_ready',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='eager_url',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
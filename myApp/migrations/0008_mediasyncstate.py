@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0007_mediaasset_eager_variant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('backend', models.CharField(max_length=200, unique=True)),
+                ('synced_through', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0008_mediasyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaAssetTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_tags', to='myApp.mediaasset')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_tags', to='myApp.mediatag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='assets', through='myApp.MediaAssetTag', to='myApp.mediatag'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaassettag',
+            index=models.Index(fields=['tag', 'asset'], name='myApp_media_tag_id_b084f8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mediaassettag',
+            constraint=models.UniqueConstraint(fields=('asset', 'tag'), name='unique_media_asset_tag'),
+        ),
+    ]
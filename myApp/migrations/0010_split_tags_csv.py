@@ -0,0 +1,39 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def split_tags_csv(apps, schema_editor):
+    """Create MediaTag / MediaAssetTag rows from every MediaAsset.tags_csv, in bulk"""
+    MediaAsset = apps.get_model('myApp', 'MediaAsset')
+    MediaTag = apps.get_model('myApp', 'MediaTag')
+    MediaAssetTag = apps.get_model('myApp', 'MediaAssetTag')
+
+    pairs = []
+    names = set()
+    for asset_id, tags_csv in MediaAsset.objects.exclude(tags_csv='').values_list('id', 'tags_csv').iterator():
+        for name in {t.strip().lower()[:100] for t in tags_csv.split(',')}:
+            if name:
+                pairs.append((asset_id, name))
+                names.add(name)
+    if not pairs:
+        return
+
+    MediaTag.objects.bulk_create([MediaTag(name=name) for name in names], batch_size=BATCH_SIZE, ignore_conflicts=True)
+    tag_ids = dict(MediaTag.objects.filter(name__in=names).values_list('name', 'id'))
+    MediaAssetTag.objects.bulk_create(
+        [MediaAssetTag(asset_id=asset_id, tag_id=tag_ids[name]) for asset_id, name in pairs],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0009_media_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_tags_csv, migrations.RunPython.noop),
+    ]
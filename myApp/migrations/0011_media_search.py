@@ -0,0 +1,68 @@
+import re
+
+from django.db import migrations
+
+SEARCH_TABLE = 'media_asset_search'
+
+
+def _words(value):
+    return ' '.join(re.findall(r'[^\W_]+', value.lower()))
+
+
+def create_search_table(apps, schema_editor):
+    """FTS5 table on SQLite, tsvector table on PostgreSQL; other databases search with icontains"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            f"title, public_id, tags, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} ('
+            f'asset_id bigint PRIMARY KEY REFERENCES "myApp_mediaasset" (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            f'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(f'CREATE INDEX {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)')
+    else:
+        return
+
+    # Backfill from existing assets
+    MediaAsset = apps.get_model('myApp', 'MediaAsset')
+    MediaAssetTag = apps.get_model('myApp', 'MediaAssetTag')
+    tags = {}
+    for asset_id, name in MediaAssetTag.objects.values_list('asset_id', 'tag__name').iterator():
+        tags.setdefault(asset_id, []).append(name)
+
+    docs = [
+        (pk, _words(title), _words(public_id), _words(' '.join(tags.get(pk, []))))
+        for pk, title, public_id in MediaAsset.objects.values_list('id', 'title', 'public_id').iterator()
+    ]
+    if not docs:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, title, public_id, tags) VALUES (%s, %s, %s, %s)', docs)
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (asset_id, document) VALUES ("
+                f"%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'C')"
+                f" || setweight(to_tsvector('simple', %s), 'B'))",
+                docs,
+            )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0010_split_tags_csv'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0011_media_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('config_kind', models.CharField(choices=[('draft', 'Draft'), ('published', 'Published'), ('legacy', 'Legacy section_config')], max_length=10)),
+                ('field_path', models.CharField(max_length=255)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='myApp.mediaasset')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_usages', to='myApp.section')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('asset', 'section', 'config_kind', 'field_path'), name='unique_media_usage')],
+            },
+        ),
+    ]
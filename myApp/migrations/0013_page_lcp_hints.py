@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0012_mediausage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='lcp_hints',
+            field=models.JSONField(blank=True, default=dict, help_text='LCP image preload hints for the published page (set on publish, see myApp.lcp)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0013_page_lcp_hints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='render_hints',
+            field=models.JSONField(blank=True, default=dict, help_text='Presentation values precomputed from published_config on publish (see myApp.render_hints)'),
+        ),
+    ]
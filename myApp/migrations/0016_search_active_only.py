@@ -0,0 +1,28 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'media_asset_search'
+
+
+def drop_inactive_rows(apps, schema_editor):
+    """The search index now holds active assets only - remove rows indexed for soft-deleted ones"""
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    MediaAsset = apps.get_model('myApp', 'MediaAsset')
+    inactive = list(MediaAsset.objects.filter(is_active=False).values_list('id', flat=True))
+    key = 'rowid' if vendor == 'sqlite' else 'asset_id'
+    with schema_editor.connection.cursor() as cursor:
+        for start in range(0, len(inactive), 500):
+            batch = inactive[start:start + 500]
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({', '.join(['%s'] * len(batch))})", batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0015_cacheversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_inactive_rows, migrations.RunPython.noop),
+    ]
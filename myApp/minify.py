@@ -0,0 +1,32 @@
+"""
+Whitespace/comment minifier for rendered public HTML.
+
+Runs once per published version (see myApp.page_cache), never per request.
+The content of <pre>, <textarea>, <script> and <style> elements is passed
+through untouched, as are IE conditional comments. Elsewhere runs of whitespace
+collapse to a single space (a single newline if the run contained one) and
+HTML comments are dropped. Whitespace between tags is collapsed rather than
+removed, so inline elements keep their separating space.
+"""
+import re
+
+PRESERVED_RE = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r'<!--(?!\[if\b)(?!<!\[endif\]).*?-->', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def minify_html(html):
+    """Minified copy of html (str)"""
+    parts = PRESERVED_RE.split(html)
+    out = []
+    # split() with two groups yields [text, element, tag name, text, element, tag name, ...]
+    for index in range(0, len(parts), 3):
+        text = COMMENT_RE.sub('', parts[index])
+        out.append(WHITESPACE_RE.sub(_collapse, text))
+        if index + 1 < len(parts):
+            out.append(parts[index + 1])
+    return ''.join(out).strip()
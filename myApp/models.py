@@ -1,9 +1,13 @@
-from django.db import models
+import hashlib
+
+from django.db import IntegrityError, models, transaction
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 
+from .render_hints import compute_render_hints
+
 
 def validate_url_or_anchor(value):
     """
@@ -31,6 +35,16 @@ def validate_url_or_anchor(value):
         )
 
 
+def media_asset_slug(public_id):
+    """
+    Slug for a MediaAsset stored under public_id. slugify() lower-cases and folds
+    '/' and '-' together, so a short hash of the exact public_id keeps slugs of
+    ids like IMG_1 / img_1 or a/b / a-b apart.
+    """
+    digest = hashlib.sha1(public_id.encode()).hexdigest()[:8]
+    return f"{slugify(public_id.replace('/', '-'))[:191]}-{digest}"
+
+
 # ==================== MEDIA ASSET MODEL ====================
 class MediaAsset(models.Model):
     """Stores Cloudinary image metadata - NO file storage"""
@@ -50,7 +64,22 @@ class MediaAsset(models.Model):
     width = models.IntegerField(default=0)  # Image width
     height = models.IntegerField(default=0)  # Image height
     format = models.CharField(max_length=10)  # jpg, png, webp, etc.
-    tags_csv = models.CharField(max_length=500, blank=True)  # Comma-separated tags
+    tags_csv = models.CharField(max_length=500, blank=True)  # Comma-separated tags (as sent to storage)
+    tags = models.ManyToManyField('MediaTag', through='MediaAssetTag', related_name='assets', blank=True)
+    
+    # Fingerprints (upload deduplication)
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of source bytes
+    perceptual_hash = models.CharField(max_length=16, blank=True, db_index=True)  # dHash of decoded image
+    
+    # Placeholder (instant render before the real image loads)
+    placeholder = models.TextField(blank=True)  # Tiny blurred WebP data URI
+    dominant_color = models.CharField(max_length=7, blank=True)  # #rrggbb
+    aspect_ratio = models.FloatField(default=0)  # width / height
+    
+    # Eager variant (2400px WebP, generated asynchronously and reported via webhook)
+    eager_ready = models.BooleanField(default=False)
+    eager_url = models.URLField(max_length=500, blank=True)
+    eager_bytes = models.IntegerField(default=0)
     
     # Status
     is_active = models.BooleanField(default=True)  # Soft delete
@@ -76,6 +105,89 @@ class MediaAsset(models.Model):
         super().save(*args, **kwargs)
 
 
+class MediaTag(models.Model):
+    """Normalized media tag (lower-cased, trimmed)"""
+    
+    name = models.CharField(max_length=100, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def normalize(names):
+        """Clean a list of raw tag strings: trimmed, lower-cased, de-duplicated, order kept"""
+        seen = []
+        for name in names:
+            name = name.strip().lower()[:100]
+            if name and name not in seen:
+                seen.append(name)
+        return seen
+
+
+class MediaAssetTag(models.Model):
+    """Through table between MediaAsset and MediaTag"""
+    
+    asset = models.ForeignKey(MediaAsset, on_delete=models.CASCADE, related_name='asset_tags')
+    tag = models.ForeignKey(MediaTag, on_delete=models.CASCADE, related_name='asset_tags')
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['asset', 'tag'], name='unique_media_asset_tag'),
+        ]
+        indexes = [
+            # Tag-first lookups for gallery filtering (asset-first is covered by the unique constraint)
+            models.Index(fields=['tag', 'asset']),
+        ]
+    
+    def __str__(self):
+        return f"{self.asset_id}:{self.tag_id}"
+
+
+class MediaSyncState(models.Model):
+    """High-water mark of the storage-to-MediaAsset sync job (one row per storage backend)"""
+    
+    backend = models.CharField(max_length=200, unique=True)  # Dotted path of the storage backend
+    synced_through = models.DateTimeField(null=True, blank=True)  # Newest remote created_at seen
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.backend} @ {self.synced_through}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version counters for rendered-output caches (public pages, gallery pages).
+    Kept in the database rather than the cache so a bump made by any process -
+    another worker, a management command - is seen by all of them.
+    """
+    
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=1)
+    
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+    
+    @classmethod
+    def current(cls, name):
+        """Current version of the named cache (1 until it is first bumped)"""
+        return cls.objects.filter(name=name).values_list('version', flat=True).first() or 1
+    
+    @classmethod
+    def bump(cls, name):
+        """Move the named cache to a new version; entries keyed on older versions are never read again"""
+        if cls.objects.filter(name=name).update(version=models.F('version') + 1):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, version=2)
+        except IntegrityError:
+            # Created concurrently by another process - bump that row instead
+            cls.objects.filter(name=name).update(version=models.F('version') + 1)
+
+
 # ==================== DASHBOARD BUILDER MODELS ====================
 class Page(models.Model):
     """Represents a page on the website (Home, About, etc.)"""
@@ -83,6 +195,7 @@ class Page(models.Model):
     slug = models.SlugField(unique=True, help_text="URL slug (e.g., 'home', 'about')")
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
+    lcp_hints = models.JSONField(default=dict, blank=True, help_text="LCP image preload hints for the published page (set on publish, see myApp.lcp)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -119,6 +232,7 @@ class Section(models.Model):
     # Draft vs Published system
     draft_config = models.JSONField(default=dict, blank=True, help_text="Draft configuration (what user is editing)")
     published_config = models.JSONField(default=dict, blank=True, help_text="Published configuration (what public site shows)")
+    render_hints = models.JSONField(default=dict, blank=True, help_text="Presentation values precomputed from published_config on publish (see myApp.render_hints)")
     
     # Legacy: section_config property for backward compatibility
     section_config = models.JSONField(default=dict, blank=True, help_text="DEPRECATED: Use published_config. Kept for backward compatibility.")
@@ -130,6 +244,10 @@ class Section(models.Model):
         """Check if draft differs from published"""
         return self.draft_config != self.published_config
     
+    def refresh_render_hints(self):
+        """Recompute render_hints from published_config (call whenever published_config changes, before saving)"""
+        self.render_hints = compute_render_hints(self.section_type, self.published_config)
+    
     def get_config_for_preview(self, preview_mode=False):
         """Get config based on mode: draft for preview, published for public"""
         # Auto-migrate: If draft_config/published_config are empty but section_config has data, copy it
@@ -140,7 +258,8 @@ class Section(models.Model):
             import copy
             self.draft_config = copy.deepcopy(self.section_config)
             self.published_config = copy.deepcopy(self.section_config)
-            self.save(update_fields=['draft_config', 'published_config'])
+            self.refresh_render_hints()
+            self.save(update_fields=['draft_config', 'published_config', 'render_hints'])
         
         if preview_mode:
             # For preview, use draft_config if it exists and is not empty, otherwise published_config
@@ -176,6 +295,28 @@ class Section(models.Model):
         return f"{self.page.name} - {self.get_section_type_display()} ({self.internal_label})"
 
 
+class MediaUsage(models.Model):
+    """Reverse index: which section config field references which MediaAsset (rebuilt on every Section save)"""
+    CONFIG_KINDS = [
+        ('draft', 'Draft'),
+        ('published', 'Published'),
+        ('legacy', 'Legacy section_config'),
+    ]
+    
+    asset = models.ForeignKey(MediaAsset, on_delete=models.CASCADE, related_name='usages')
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name='media_usages')
+    config_kind = models.CharField(max_length=10, choices=CONFIG_KINDS)
+    field_path = models.CharField(max_length=255)  # Dotted path into the config, e.g. "cards.2.image_url"
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['asset', 'section', 'config_kind', 'field_path'], name='unique_media_usage'),
+        ]
+    
+    def __str__(self):
+        return f"{self.asset_id} in section {self.section_id} ({self.config_kind}: {self.field_path})"
+
+
 class ButtonConfig(models.Model):
     """Reusable button configuration"""
     label = models.CharField(max_length=200)
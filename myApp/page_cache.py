@@ -0,0 +1,118 @@
+"""
+Rendered-output cache for public pages.
+
+Each public page is rendered, minified and compressed (gzip, plus brotli when
+the brotli package is installed) at the highest level once per published
+version, and every encoding is kept in the default cache; requests in between
+only pick one by Accept-Encoding and send it. The version is a site-wide
+counter bumped whenever anything a public page shows can change (Page, Section
+and MediaAsset saves/deletes - see MyappConfig.ready), so entries from older
+versions are simply never read again. It is a CacheVersion row, not a cache
+key: the default cache is per process, and a publish handled by one worker (or
+a change made by a management command) has to reach every worker.
+
+Responses carry the edge caching headers from myApp.cdn; the dashboard purges
+the CDN copy alongside bumping the version here.
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only without it
+    brotli = None
+
+from .cdn import public_cache_control, surrogate_keys
+from .minify import minify_html
+from .models import CacheVersion
+
+VERSION_KEY = 'pages'  # CacheVersion name
+
+# Preferred first when the client accepts several encodings with equal q
+ENCODING_PREFERENCE = ('br', 'gzip')
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*')
+
+
+def page_cache_version() -> int:
+    """Current published version (cached pages from older versions are ignored)"""
+    return CacheVersion.current(VERSION_KEY)
+
+
+def invalidate_page_cache(**kwargs):
+    """Bump the published version. Also connected to Page/Section/MediaAsset save and delete signals."""
+    CacheVersion.bump(VERSION_KEY)
+
+
+def cached_page(slug, render_page):
+    """
+    Cache entry for the public page slug, built with render_page() -> HttpResponse
+    on a miss. Returns {'slug': str, 'html': bytes, 'encodings': {coding: bytes}, 'content_type': str}.
+    """
+    # The footer prints the current year, so a new year starts a new entry
+    cache_key = f'pages:{slug}:{page_cache_version()}:{timezone.now().year}'
+    entry = cache.get(cache_key)
+    if entry is not None:
+        return entry
+
+    response = render_page()
+    html = response.content.decode(response.charset)
+    if getattr(settings, 'HTML_MINIFY', True):
+        html = minify_html(html)
+    body = html.encode(response.charset)
+    entry = {
+        'slug': slug,
+        'html': body,
+        'encodings': compress_variants(body),
+        'content_type': response['Content-Type'],
+    }
+    cache.set(cache_key, entry, getattr(settings, 'PAGE_CACHE_TIMEOUT', 86400))
+    return entry
+
+
+def compress_variants(body):
+    """{content-coding: bytes} at maximum compression; encodings that don't shrink the body are left out"""
+    variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    return {coding: data for coding, data in variants.items() if len(data) < len(body)}
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Best content-coding in available for an Accept-Encoding header, or None for identity"""
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        match = ACCEPT_ENCODING_RE.fullmatch(item)
+        if not match:
+            continue
+        try:
+            accepted[match.group(1).lower()] = float(match.group(2) or 1)
+        except ValueError:
+            continue
+
+    best, best_q = None, 0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        q = accepted.get(coding, accepted.get('*', 0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def page_response(request, entry):
+    """HttpResponse for a cached_page() entry in the best encoding the client accepts, with edge caching headers"""
+    coding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), entry['encodings'])
+    response = HttpResponse(entry['encodings'][coding] if coding else entry['html'], content_type=entry['content_type'])
+    if coding:
+        response['Content-Encoding'] = coding
+    # Every variant says so, or a shared cache could hand gzip to a client that can't read it
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = public_cache_control()
+    response['Surrogate-Key'] = ' '.join(surrogate_keys(entry['slug']))
+    return response
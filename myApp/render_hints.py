@@ -0,0 +1,143 @@
+"""
+Presentation values derived from a section's config: background class/CSS,
+button class strings and divider flags.
+
+publish_page stores compute_render_hints() of the published config on
+Section.render_hints, so a public render only looks them up. Drafts (preview)
+and sections published before hints existed are computed on the fly.
+"""
+# Bump when the derivation below changes so stored hints are recomputed instead of trusted
+RENDER_HINTS_VERSION = 1
+
+BUTTON_LAYOUTS = {
+    'inline': 'inline-block px-8 py-4',
+    'flex': 'px-8 py-4 text-center',  # flex-row button groups (hero)
+    'card': 'inline-block w-full text-center px-6 py-3',
+}
+BUTTON_TONES = {
+    'gold': 'bg-gold text-navy-deep hover:bg-champagne hover:scale-105 shadow-lg shadow-gold/30',
+    'navy': 'bg-navy-deep text-white hover:bg-navy-midnight hover:scale-105',
+    'navy_flat': 'bg-navy-deep text-white hover:bg-navy-midnight',
+    'outline': 'border-2 border-gold text-gold hover:bg-gold/10',
+}
+BUTTON_SHAPES = {
+    'pill': 'rounded-full',
+    'square': 'rounded-none',
+    'rounded': 'rounded-lg',
+}
+BUTTON_CLASSES = {
+    (layout, tone, shape): f'{layout_class} {tone_class} {shape_class} font-semibold transition-all duration-300'
+    for layout, layout_class in BUTTON_LAYOUTS.items()
+    for tone, tone_class in BUTTON_TONES.items()
+    for shape, shape_class in BUTTON_SHAPES.items()
+}
+
+# section_type -> {button: (layout, tone, fixed shape or None to use the configured one)}
+SECTION_BUTTONS = {
+    'hero': {'primary': ('flex', 'gold', None), 'secondary': ('flex', 'outline', None)},
+    'statistics': {'primary': ('inline', 'gold', None)},
+    'credibility': {'primary': ('inline', 'navy', 'pill')},
+    'testimonials': {'primary': ('inline', 'navy', 'pill')},
+    'pain_points': {'primary': ('inline', 'gold', 'pill')},
+    'what_makes_me_different': {'primary': ('inline', 'navy', 'pill')},
+    'meet_kim': {'primary': ('inline', 'navy', 'pill')},
+    'free_resource': {'primary': ('inline', 'gold', 'pill')},
+}
+
+# Editor direction values -> CSS linear-gradient directions
+GRADIENT_DIRECTIONS = {
+    'to-right': 'to right',
+    'to-bottom': 'to bottom',
+    'to-left': 'to left',
+    'to-top': 'to top',
+    'to-top-right': 'to top right',
+    'to-bottom-right': 'to bottom right',
+    'to-top-left': 'to top left',
+    'to-bottom-left': 'to bottom left',
+}
+BACKGROUND_IMAGE_CLASS = 'bg-cover bg-center bg-no-repeat'
+DARK_BAND_CLASS = 'bg-gradient-to-br from-navy-deep via-navy-midnight to-navy-deep'
+
+
+def button_class(layout, tone, shape):
+    """Class string for a button; unknown shapes fall back to rounded"""
+    return BUTTON_CLASSES.get((layout, tone, shape)) or BUTTON_CLASSES[(layout, tone, 'rounded')]
+
+
+def background_hints(config):
+    """(extra class, inline CSS) for a section's root element: background image, then gradient, then background_style"""
+    background = config.get('background_image')
+    image_url = background.get('url', '') if isinstance(background, dict) else ''
+    if image_url:
+        return BACKGROUND_IMAGE_CLASS, f"background-image: url('{image_url}');"
+
+    gradient = config.get('gradient')
+    if not isinstance(gradient, dict):
+        gradient = {}
+    colors = gradient.get('colors')
+    colors = ', '.join(str(color) for color in colors) if isinstance(colors, list) else ''
+    gradient_type = gradient.get('type', 'none')
+    if colors and gradient_type == 'linear':
+        direction = GRADIENT_DIRECTIONS.get(gradient.get('direction', 'to-right'), 'to right')
+        return '', f'background: linear-gradient({direction}, {colors});'
+    if colors and gradient_type == 'radial':
+        return '', f'background: radial-gradient(circle, {colors});'
+    if colors and gradient_type == 'conic':
+        return '', f'background: conic-gradient({colors});'
+
+    if config.get('background_style', '') == 'dark_band':
+        return DARK_BAND_CLASS, ''
+    return '', ''
+
+
+def compute_render_hints(section_type, config):
+    """Render hints for one section config (JSON-serialisable)"""
+    if not isinstance(config, dict):
+        config = {}
+    background_class, background_css = background_hints(config)
+
+    buttons = {}
+    for name, (layout, tone, shape) in SECTION_BUTTONS.get(section_type, {}).items():
+        button = config.get(f'{name}_button')
+        default_shape = 'pill' if name == 'secondary' else 'rounded'  # SectionObject's defaults
+        configured_shape = button.get('shape', default_shape) if isinstance(button, dict) else default_shape
+        buttons[name] = button_class(layout, tone, shape or configured_shape)
+
+    return {
+        'version': RENDER_HINTS_VERSION,
+        'background_class': background_class,
+        'background_css': background_css,
+        'buttons': buttons,
+        'show_divider_above': bool(config.get('show_divider_above', False)),
+        'show_divider_below': bool(config.get('show_divider_below', False)),
+    }
+
+
+def hints_for(section, config):
+    """Stored hints when config is the section's published config and they are current, else computed now"""
+    hints = section.render_hints if config is section.published_config else None
+    if not hints or hints.get('version') != RENDER_HINTS_VERSION:
+        hints = compute_render_hints(section.section_type, config)
+    return hints
+
+
+def apply_render_hints(obj, hints):
+    """Copy hints onto a template-facing section object as the attributes the section tags read"""
+    obj.background_class = hints['background_class']
+    obj.background_css = hints['background_css']
+    obj.primary_button_class = hints['buttons'].get('primary', '')
+    obj.secondary_button_class = hints['buttons'].get('secondary', '')
+    obj.show_divider_above = hints['show_divider_above']
+    obj.show_divider_below = hints['show_divider_below']
+
+
+def apply_legacy_render_hints(obj, section_type):
+    """Hints for a legacy per-type section model (the pre-Page fallback), derived from the fields it has"""
+    config = {
+        key: getattr(obj, key)
+        for key in ('background_style', 'show_divider_above', 'show_divider_below')
+        if hasattr(obj, key)
+    }
+    # Legacy models have no button shape fields; templates always fell back to rounded for them
+    config.update(primary_button={'shape': 'rounded'}, secondary_button={'shape': 'rounded'})
+    apply_render_hints(obj, compute_render_hints(section_type, config))
@@ -0,0 +1,73 @@
+"""
+Responsive image URL helpers shared by the media_tags template tags and the
+LCP preload hints computed at publish time, so both produce identical srcsets.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+
+from dashboard.storage import split_cloudinary_path
+
+DEFAULT_WIDTHS = (320, 480, 640, 768, 1024, 1280, 1600, 2000, 2400)
+DEFAULT_SRC_WIDTH = 1280  # src for browsers that ignore srcset
+CLOUDINARY_UPLOAD_RE = re.compile(r'^(?P<base>https?://res\.cloudinary\.com/[^/]+/image/upload/)(?P<path>[^?#]+)$')
+
+# sizes attribute of the two-column text/image layouts (image takes half the row from lg up)
+TWO_COLUMN_SIZES = '(min-width: 1024px) 50vw, 100vw'
+
+
+def width_variant(url, width):
+    """URL of the image scaled down to at most width pixels, or None if the host can't resize"""
+    match = CLOUDINARY_UPLOAD_RE.match(url)
+    if match:
+        # Replace any baked-in transformations (f_auto,q_auto / c_fill,...) with ours
+        _, version, segments = split_cloudinary_path(match.group('path'))
+        path = '/'.join([version, *segments] if version else segments)
+        return f"{match.group('base')}f_auto,q_auto,c_limit,w_{width}/{path}"
+
+    parts = urlsplit(url)
+    if parts.netloc == 'images.unsplash.com':
+        query = dict(parse_qsl(parts.query))
+        # A fixed crop (w=800&h=1000&fit=crop) keeps its aspect ratio at every width;
+        # a height without a known width can't be scaled, so the crop is dropped
+        original_width, height = query.get('w', ''), query.pop('h', '')
+        if height.isdigit() and original_width.isdigit() and int(original_width):
+            query['h'] = str(max(1, round(int(height) * width / int(original_width))))
+        elif query.get('fit') == 'crop':
+            del query['fit']
+        query['w'] = str(width)
+        query.setdefault('auto', 'format')
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    return None
+
+
+def candidate_widths(widths, intrinsic_width=0):
+    """Breakpoint widths, capped at the image's own width when it is known"""
+    widths = sorted(int(w) for w in widths)
+    if intrinsic_width:
+        capped = [w for w in widths if w < intrinsic_width]
+        return capped + [intrinsic_width] if intrinsic_width <= widths[-1] else widths
+    return widths
+
+
+def image_sources(url, widths=None, intrinsic_width=0):
+    """
+    (src, srcset) for url. srcset is '' when the host can't resize, in which
+    case src is the url unchanged.
+    """
+    widths = tuple(widths or getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', DEFAULT_WIDTHS))
+    return _image_sources(url, widths, int(intrinsic_width or 0))
+
+
+@lru_cache(maxsize=1024)
+def _image_sources(url, widths, intrinsic_width):
+    # Pure function of its arguments, and the same few images render on every request
+    if not width_variant(url, 1):
+        return url, ''
+    candidates = candidate_widths(widths, intrinsic_width)
+    fallback = max([w for w in candidates if w <= DEFAULT_SRC_WIDTH] or candidates[:1])
+    srcset = ', '.join(f'{width_variant(url, w)} {w}w' for w in candidates)
+    return width_variant(url, fallback), srcset
@@ -0,0 +1,64 @@
+"""
+Template tags for rendering stored images responsively.
+
+    {% load media_tags %}
+    {% responsive_image section.image_url section.image_alt_text sizes="(min-width: 1024px) 50vw, 100vw" width=section.image_width height=section.image_height css_class="w-full h-auto" %}
+"""
+from functools import lru_cache
+
+from django import template
+from django.utils.html import conditional_escape, format_html, format_html_join
+
+from myApp.models import MediaAsset
+from myApp.responsive import image_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', width=0, height=0, css_class='', lazy=True,
+                     widths='', fetchpriority=''):
+    """
+    <img> with a width-breakpoint srcset for Cloudinary (f_auto,q_auto,c_limit,w_N) and
+    Unsplash URLs; other URLs get a plain src. image is a URL or a MediaAsset, whose
+    dimensions are used when width/height aren't given. lazy=False for above-the-fold images.
+    """
+    if isinstance(image, MediaAsset):
+        width = width or image.width
+        height = height or image.height
+        url = image.secure_url
+    else:
+        url = image or ''
+    if not url:
+        return ''
+
+    breakpoints = tuple(w.strip() for w in str(widths).split(',') if w.strip())
+    # Escape up front so cache keys don't depend on whether a value arrived marked safe
+    return _img_tag(
+        url, conditional_escape(alt or ''), conditional_escape(sizes), int(width or 0), int(height or 0),
+        conditional_escape(css_class), bool(lazy), breakpoints, conditional_escape(fetchpriority),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _img_tag(url, alt, sizes, width, height, css_class, lazy, breakpoints, fetchpriority):
+    # Pages re-render the same few images with the same arguments on every
+    # request, so the escaped markup is built once per distinct call
+    src, srcset = image_sources(url, breakpoints, width)
+    attrs = [('src', src)]
+    if srcset:
+        attrs.extend([('srcset', srcset), ('sizes', sizes)])
+
+    attrs.append(('alt', alt))
+    if width and height:
+        attrs.extend([('width', width), ('height', height)])
+    if css_class:
+        attrs.append(('class', css_class))
+    # Never lazy-load the image the page preloads as its LCP element
+    if lazy and fetchpriority != 'high':
+        attrs.append(('loading', 'lazy'))
+    attrs.append(('decoding', 'async'))
+    if fetchpriority:
+        attrs.append(('fetchpriority', fetchpriority))
+
+    return format_html('<img {}>', format_html_join(' ', '{}="{}"', attrs))
@@ -0,0 +1,92 @@
+"""
+Template tags for the building blocks the section partials share: buttons,
+background (image / gradient) attributes, golden-thread dividers and section images.
+
+    {% load section_tags %}
+    <section{% section_background hero_section "relative py-24 md:py-32 overflow-hidden" %}>
+    {% section_divider hero_section.show_divider_above "above" gold=True %}
+    {% section_button hero_section.primary_button_label hero_section.primary_button_url css_class=hero_section.primary_button_class %}
+    <div class="rounded-2xl overflow-hidden"{% placeholder_style credibility_section %}>{% section_image credibility_section %}</div>
+
+Class strings and background CSS come precomputed from myApp.render_hints, so
+a tag call is a lookup and one format_html instead of a chain of {% if %}/{% with %}
+branches.
+"""
+from functools import lru_cache
+
+from django import template
+from django.utils.html import conditional_escape, format_html
+from django.utils.safestring import mark_safe
+
+from myApp.render_hints import button_class
+from myApp.responsive import TWO_COLUMN_SIZES
+from .media_tags import responsive_image
+
+register = template.Library()
+
+DIVIDERS = {
+    (position, gold): mark_safe(f'<div class="golden-thread {margin}{" bg-gold" if gold else ""}"></div>')
+    for position, margin in (('above', 'mb-16'), ('below', 'mt-16'))
+    for gold in (False, True)
+}
+
+
+@register.simple_tag
+def section_button(label, url, tone='gold', shape='rounded', layout='inline', css_class=''):
+    """
+    <a> call-to-action button; renders nothing without a label. css_class is a
+    precomputed class string (SectionObject.primary_button_class etc.); without
+    it the class comes from layout/tone/shape.
+    """
+    if not label:
+        return ''
+    css_class = css_class or button_class(layout, tone, shape)
+    return _button_html(conditional_escape(label), conditional_escape(url), css_class)
+
+
+@lru_cache(maxsize=256)
+def _button_html(label, url, css_class):
+    return format_html('<a href="{}" class="{}">{}</a>', url, css_class, label)
+
+
+@register.simple_tag
+def section_divider(show, position='above', gold=False):
+    """Golden-thread divider above or below a section's content"""
+    if not show:
+        return ''
+    return DIVIDERS[(position, bool(gold))]
+
+
+@register.simple_tag
+def section_background(section, base_class, default_class='bg-white'):
+    """
+    class/style attributes for a section's root element from its precomputed
+    background hints; default_class applies when it has no background at all.
+    """
+    extra_class = section.background_class or ('' if section.background_css else default_class)
+    css_class = f'{base_class} {extra_class}' if extra_class else base_class
+    if section.background_css:
+        return format_html(' class="{}" style="{}"', css_class, section.background_css)
+    return format_html(' class="{}"', css_class)
+
+
+@register.simple_tag
+def placeholder_style(section):
+    """style attribute painting the image's LQIP placeholder behind it while it loads"""
+    placeholder = getattr(section, 'image_placeholder', '')  # legacy section models have no media metadata
+    if not placeholder:
+        return ''
+    return format_html(
+        ' style="background: {} url(\'{}\') center / cover no-repeat;"',
+        section.image_dominant_color, placeholder,
+    )
+
+
+@register.simple_tag
+def section_image(section, sizes=TWO_COLUMN_SIZES, css_class='w-full h-auto object-cover', lazy=True):
+    """The section's main image via responsive_image, with its stored dimensions and fetch priority"""
+    return responsive_image(
+        section.image_url, section.image_alt_text, sizes=sizes,
+        width=getattr(section, 'image_width', 0), height=getattr(section, 'image_height', 0),
+        css_class=css_class, lazy=lazy, fetchpriority=getattr(section, 'image_fetchpriority', ''),
+    )
@@ -1,3 +1,59 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .minify import minify_html
+from .page_cache import negotiate_encoding
+
+
+class MinifyHtmlTests(SimpleTestCase):
+
+    def test_whitespace_collapses_but_keeps_inline_separation(self):
+        html = '<p>\n    Hello   <b>big</b>\t<i>world</i>\n</p>\n\n<p>  x  </p>'
+
+        self.assertEqual(minify_html(html), '<p>\nHello <b>big</b> <i>world</i>\n</p>\n<p> x </p>')
+
+    def test_comments_are_dropped(self):
+        self.assertEqual(minify_html('<p>a<!-- note\n spanning lines -->b</p>'), '<p>ab</p>')
+
+    def test_conditional_comments_are_kept(self):
+        html = '<!--[if lt IE 9]><script src="shim.js"></script><![endif]-->'
+
+        self.assertEqual(minify_html(html), html)
+
+    def test_preserved_elements_pass_through(self):
+        blocks = [
+            '<pre>  line 1\n\n    line 2  <!-- kept --></pre>',
+            '<TEXTAREA name="t">  a\n  b</TEXTAREA>',
+            '<script type="module">\n  const s = "  two  spaces";  // <!-- x -->\n</script>',
+            '<style media="screen">\n  a  {  color: red  }\n</style >',
+        ]
+        html = '  <div>\n  ' + '\n   <!-- gone -->  '.join(blocks) + '  </div>  '
+
+        self.assertEqual(minify_html(html), '<div>\n' + '\n'.join(blocks) + ' </div>')
+
+
+class NegotiateEncodingTests(SimpleTestCase):
+    both = {'br': b'', 'gzip': b''}
+
+    def test_brotli_is_preferred_at_equal_quality(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br', self.both), 'br')
+
+    def test_quality_values_decide(self):
+        self.assertEqual(negotiate_encoding('br;q=0.5, gzip', self.both), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip;q=0.8, br;q=0.9', self.both), 'br')
+
+    def test_only_available_codings_are_chosen(self):
+        self.assertEqual(negotiate_encoding('br, gzip', {'gzip': b''}), 'gzip')
+        self.assertIsNone(negotiate_encoding('br', {'gzip': b''}))
+
+    def test_identity_when_nothing_acceptable(self):
+        for header in ('', None, 'identity', 'deflate', 'gzip;q=0, br;q=0', '*;q=0'):
+            with self.subTest(header=header):
+                self.assertIsNone(negotiate_encoding(header, self.both))
+
+    def test_wildcard_and_explicit_refusal(self):
+        self.assertEqual(negotiate_encoding('*', self.both), 'br')
+        self.assertEqual(negotiate_encoding('br;q=0, *', self.both), 'gzip')
+
+    def test_malformed_items_are_ignored(self):
+        self.assertEqual(negotiate_encoding('br;q=abc, gzip;q=0.2, ;;', self.both), 'gzip')
+        self.assertEqual(negotiate_encoding(' GZIP ; q=0.7 ', self.both), 'gzip')
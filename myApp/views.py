@@ -1,7 +1,11 @@
+from django.db.models import Q
 from django.shortcuts import render
 from django.views.decorators.clickjacking import xframe_options_exempt
+from .lcp import LCP_HINTS_VERSION, refresh_lcp_hints
+from .page_cache import cached_page, page_response
+from .render_hints import apply_legacy_render_hints, apply_render_hints, hints_for
 from .models import (
-    Page, Section,
+    Page, Section, MediaAsset,
     HeroSection,
     StatisticsSection,
     CredibilitySection,
@@ -32,6 +36,9 @@ def convert_section_config_to_template_format(section, config=None):
     if not isinstance(config, dict):
         config = {}
     
+    # Background/button/divider presentation: stored on publish, computed for drafts
+    hints = hints_for(section, config)
+    
     # Create mock objects for related items
     class MockRelatedItem:
         def __init__(self, data):
@@ -50,8 +57,6 @@ def convert_section_config_to_template_format(section, config=None):
         def __init__(self, config, section):
             # Default to True if not specified, or use section.is_enabled
             self.show_section = config.get('show_section', section.is_enabled if hasattr(section, 'is_enabled') else True)
-            self.show_divider_above = config.get('show_divider_above', False)
-            self.show_divider_below = config.get('show_divider_below', False)
             self.headline = config.get('headline', '')
             self.subheadline = config.get('subheadline', '')
             self.body_text = config.get('body_text', '')
@@ -68,6 +73,13 @@ def convert_section_config_to_template_format(section, config=None):
             self.image_url = config.get('image', {}).get('url', '')
             self.image_alt_text = config.get('image', {}).get('alt_text', '')
             self.image_position = config.get('image_position', 'right')
+            # Image metadata from the matching MediaAsset (see attach_media_metadata)
+            self.image_width = 0
+            self.image_height = 0
+            self.image_placeholder = ''
+            self.image_dominant_color = ''
+            # 'high' on the page's preloaded LCP image (see myApp.lcp)
+            self.image_fetchpriority = ''
             self.icon = config.get('icon', '')
             self.layout_variant = config.get('layout_variant', '')
             self.background_style = config.get('background_style', '')
@@ -116,6 +128,8 @@ def convert_section_config_to_template_format(section, config=None):
                 self.sociallink_set = MockRelatedManager(config.get('social_links', []))
                 self.footerlink_set = MockRelatedManager(config.get('footer_links', []))
             
+            apply_render_hints(self, hints)
+            
             # For debugging
             self._section = section
             self._config = config
@@ -123,21 +137,74 @@ def convert_section_config_to_template_format(section, config=None):
     return SectionObject(config, section)
 
 
+def attach_media_metadata(section_objs):
+    """Copy MediaAsset dimensions and placeholder data onto section images (single query)"""
+    urls = {obj.image_url for obj in section_objs if obj.image_url}
+    if not urls:
+        return
+    
+    assets = {}
+    rows = MediaAsset.objects.filter(Q(web_url__in=urls) | Q(secure_url__in=urls)).values(
+        'web_url', 'secure_url', 'width', 'height', 'placeholder', 'dominant_color'
+    )
+    for row in rows:
+        assets[row['web_url']] = row
+        assets[row['secure_url']] = row
+    
+    for obj in section_objs:
+        row = assets.get(obj.image_url)
+        if row:
+            obj.image_width = row['width']
+            obj.image_height = row['height']
+            obj.image_placeholder = row['placeholder']
+            obj.image_dominant_color = row['dominant_color']
+
+
+# Context name of each legacy section model -> its Section.section_type
+LEGACY_SECTION_TYPES = {
+    'hero_section': 'hero',
+    'statistics_section': 'statistics',
+    'credibility_section': 'credibility',
+    'testimonials_section': 'testimonials',
+    'pain_points_section': 'pain_points',
+    'what_makes_me_different_section': 'what_makes_me_different',
+    'featured_publications_section': 'featured_publications',
+    'services_section': 'services',
+    'meet_kim_herrlein_section': 'meet_kim',
+    'mission_section': 'mission',
+    'free_resource_section': 'free_resource',
+    'footer_section': 'footer',
+}
+
+
 def home(request, preview_mode=False):
     """Homepage view - uses Page/Section if available, falls back to legacy models
     
     Args:
         preview_mode: If True, uses draft_config. If False, uses published_config.
     """
+    if preview_mode:
+        return render_home(request, preview_mode=True)
+    # Public page: rendered, minified and compressed once per published version (see myApp.page_cache)
+    entry = cached_page('home', lambda: render_home(request))
+    return page_response(request, entry)
+
+
+def render_home(request, preview_mode=False):
+    """Render home.html from the published (or, for preview, draft) section configs"""
     # Try to get Page with slug="home"
     page = Page.objects.filter(slug="home", is_active=True).first()
     
     if page:
+        if not preview_mode and page.lcp_hints.get('version') != LCP_HINTS_VERSION:
+            refresh_lcp_hints(page)  # stored before the current derivation - redo once
         sections = page.sections.filter(is_enabled=True).order_by('sort_order')
         
         # Build context from sections
         context = {'page': page, 'preview_mode': preview_mode}
         
+        section_objs = []
+        
         # Map sections by type
         for section in sections:
             # Get config based on mode
@@ -150,6 +217,9 @@ def home(request, preview_mode=False):
             else:
                 # Skip empty configs
                 continue
+            if not preview_mode and page.lcp_hints.get('section_id') == section.id and page.lcp_hints.get('kind') == 'image':
+                section_obj.image_fetchpriority = 'high'
+            section_objs.append(section_obj)
             
             if section.section_type == 'hero':
                 context['hero_section'] = section_obj
@@ -178,6 +248,9 @@ def home(request, preview_mode=False):
                 if 'footer_section' not in context:
                     context['footer_section'] = section_obj
         
+        # Image dimensions + LQIP placeholders for layout-stable rendering
+        attach_media_metadata(section_objs)
+        
         # Only get footer from legacy model if not already set from sections
         if 'footer_section' not in context:
             context['footer_section'] = FooterSection.objects.filter(show_section=True).first()
@@ -199,6 +272,9 @@ def home(request, preview_mode=False):
             'free_resource_section': FreeResourceSection.objects.filter(show_section=True).first(),
             'footer_section': FooterSection.objects.filter(show_section=True).first(),
         }
+        for name, section_type in LEGACY_SECTION_TYPES.items():
+            if context[name] is not None:
+                apply_legacy_render_hints(context[name], section_type)
         return render(request, 'home.html', context)
 
 
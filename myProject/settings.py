@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'myApp',
     'dashboard',
@@ -54,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -131,10 +134,47 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed copies (plus .gz/.br) and WhiteNoise serves those
+# with a one-year immutable Cache-Control, so repeat visits never revalidate them.
+# WHITENOISE_MAX_AGE only applies to unhashed names (files requested by their original path).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+WHITENOISE_MAX_AGE = int(os.getenv('WHITENOISE_MAX_AGE', '3600'))
+
+# Caches
+# 'default' is per process: rendered public pages and gallery pages are keyed on CacheVersion rows,
+# so a worker never serves an outdated version from it. 'shared' holds state every worker must see
+# (chunked upload resume points). Set REDIS_URL in production - required with more than one host;
+# without it a file-based cache shared by the processes of this machine is used.
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SHARED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'kimherrlein-shared-cache')),
+    },
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Where uploaded images are stored. Set to dashboard.storage.LocalStorageBackend
+# to keep everything under MEDIA_ROOT/MEDIA_LOCAL_SUBDIR (offline dev and load tests).
+MEDIA_STORAGE_BACKEND = os.getenv('MEDIA_STORAGE_BACKEND', 'dashboard.storage.CloudinaryStorageBackend')
+MEDIA_LOCAL_SUBDIR = os.getenv('MEDIA_LOCAL_SUBDIR', 'library')
+
 # Cloudinary Configuration
 import cloudinary
 import cloudinary.uploader
@@ -160,6 +200,89 @@ else:
     print("CLOUDINARY_API_KEY=your_api_key")
     print("CLOUDINARY_API_SECRET=your_api_secret")
 
+# Point uploads at another API host, e.g. a local stand-in server for failure-injection runs
+CLOUDINARY_UPLOAD_PREFIX = os.getenv('CLOUDINARY_UPLOAD_PREFIX', '')
+if CLOUDINARY_UPLOAD_PREFIX:
+    cloudinary.config(upload_prefix=CLOUDINARY_UPLOAD_PREFIX)
+
+# Image compression admission control
+# Caps concurrent WebP encodes so editor uploads can't starve public page rendering.
+# Uploads beyond CONCURRENCY wait (up to QUEUE_DEPTH of them, for QUEUE_TIMEOUT seconds);
+# anything else gets a fast 503 with Retry-After.
+IMAGE_COMPRESSION_CONCURRENCY = int(os.getenv('IMAGE_COMPRESSION_CONCURRENCY', '2'))
+IMAGE_COMPRESSION_QUEUE_DEPTH = int(os.getenv('IMAGE_COMPRESSION_QUEUE_DEPTH', '4'))
+IMAGE_COMPRESSION_QUEUE_TIMEOUT = float(os.getenv('IMAGE_COMPRESSION_QUEUE_TIMEOUT', '10'))
+
+# Upload memory bounds
+# Uploads always stream to a temp file on disk instead of being held in memory.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+# Encoded WebP output stays in memory up to this size, then spills to a temp file.
+IMAGE_UPLOAD_SPOOL_MAX_BYTES = int(os.getenv('IMAGE_UPLOAD_SPOOL_MAX_BYTES', str(2 * 1024 * 1024)))
+# Largest decoded pixel buffer an upload may allocate (RGB = 3 bytes/pixel).
+IMAGE_MAX_DECODE_PIXELS = int(os.getenv('IMAGE_MAX_DECODE_PIXELS', '50000000'))
+
+# WebP encode mode
+# 'bytes' takes the highest quality that fits under the size limit.
+# 'perceptual' picks the lowest quality whose SSIM against the source (on a
+# downsampled luminance channel) stays at or above IMAGE_SSIM_THRESHOLD.
+IMAGE_ENCODE_MODE = os.getenv('IMAGE_ENCODE_MODE', 'bytes')
+IMAGE_SSIM_THRESHOLD = float(os.getenv('IMAGE_SSIM_THRESHOLD', '0.99'))
+IMAGE_SSIM_MAX_SIDE = int(os.getenv('IMAGE_SSIM_MAX_SIDE', '512'))
+
+# Two-phase WebP encode
+# Uploads encode at the fast effort level so the asset is usable immediately; a
+# background task then re-encodes at the best effort level and replaces the stored
+# file if it came out smaller. Set both to 6 to do everything inside the request.
+IMAGE_FAST_WEBP_METHOD = int(os.getenv('IMAGE_FAST_WEBP_METHOD', '2'))
+IMAGE_BEST_WEBP_METHOD = int(os.getenv('IMAGE_BEST_WEBP_METHOD', '6'))
+
+# Cloudinary HTTP transport: one keep-alive connection pool shared by uploads and API calls
+CLOUDINARY_HTTP_POOL_MAXSIZE = int(os.getenv('CLOUDINARY_HTTP_POOL_MAXSIZE', '4'))
+CLOUDINARY_HTTP_CONNECT_TIMEOUT = float(os.getenv('CLOUDINARY_HTTP_CONNECT_TIMEOUT', '5'))
+CLOUDINARY_HTTP_READ_TIMEOUT = float(os.getenv('CLOUDINARY_HTTP_READ_TIMEOUT', '60'))
+CLOUDINARY_UPLOAD_TIMEOUT = float(os.getenv('CLOUDINARY_UPLOAD_TIMEOUT', '120'))
+
+# Asynchronous eager transformations
+# The 2400px WebP variant is generated after the upload returns; Cloudinary reports it to
+# CLOUDINARY_EAGER_NOTIFICATION_URL (absolute URL of dashboard:cloudinary_notification).
+# Turn signature verification off only to post canned notification payloads locally.
+CLOUDINARY_EAGER_ASYNC = os.getenv('CLOUDINARY_EAGER_ASYNC', 'True') == 'True'
+CLOUDINARY_EAGER_NOTIFICATION_URL = os.getenv('CLOUDINARY_EAGER_NOTIFICATION_URL', '')
+CLOUDINARY_VERIFY_NOTIFICATIONS = os.getenv('CLOUDINARY_VERIFY_NOTIFICATIONS', 'True') == 'True'
+
+# Chunked, resumable uploads
+# Files at or above the threshold go up in CHUNK_SIZE parts (Cloudinary's minimum is 5MB,
+# except for the last part). Each part is retried CHUNK_RETRIES times with exponential
+# backoff starting at CHUNK_BACKOFF seconds; progress is cached for CHUNK_RESUME_TTL seconds.
+CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD = int(os.getenv('CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD', str(5 * 1024 * 1024)))
+CLOUDINARY_CHUNK_SIZE = int(os.getenv('CLOUDINARY_CHUNK_SIZE', str(5 * 1024 * 1024)))
+CLOUDINARY_CHUNK_RETRIES = int(os.getenv('CLOUDINARY_CHUNK_RETRIES', '4'))
+CLOUDINARY_CHUNK_BACKOFF = float(os.getenv('CLOUDINARY_CHUNK_BACKOFF', '0.5'))
+CLOUDINARY_CHUNK_TIMEOUT = float(os.getenv('CLOUDINARY_CHUNK_TIMEOUT', '60'))
+CLOUDINARY_CHUNK_RESUME_TTL = int(os.getenv('CLOUDINARY_CHUNK_RESUME_TTL', '3600'))
+
+# Media gallery API: default page size (?limit= may ask for up to 100) and per-cursor cache lifetime
+GALLERY_PAGE_SIZE = int(os.getenv('GALLERY_PAGE_SIZE', '48'))
+GALLERY_CACHE_TIMEOUT = int(os.getenv('GALLERY_CACHE_TIMEOUT', '300'))
+
+# Public page cache: rendered HTML is minified and cached once per published version;
+# the timeout only bounds how long edits made outside the dashboard (admin, legacy models) take to show
+HTML_MINIFY = os.getenv('HTML_MINIFY', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '86400'))
+
+# Edge caching for public pages: a CDN keeps each page for PAGE_EDGE_MAX_AGE (s-maxage) seconds,
+# serving the stale copy for up to PAGE_STALE_WHILE_REVALIDATE more while it refetches; browsers
+# revalidate after PAGE_BROWSER_MAX_AGE. Dashboard edits to the live page purge it through
+# CDN_PURGE_BACKEND (myApp.cdn.LocalPurgeBackend only logs; myApp.cdn.FastlyPurgeBackend purges by surrogate key).
+PAGE_EDGE_MAX_AGE = int(os.getenv('PAGE_EDGE_MAX_AGE', '86400'))
+PAGE_STALE_WHILE_REVALIDATE = int(os.getenv('PAGE_STALE_WHILE_REVALIDATE', '60'))
+PAGE_BROWSER_MAX_AGE = int(os.getenv('PAGE_BROWSER_MAX_AGE', '0'))
+CDN_PURGE_BACKEND = os.getenv('CDN_PURGE_BACKEND', 'myApp.cdn.LocalPurgeBackend')
+CDN_PURGE_SERVICE_ID = os.getenv('CDN_PURGE_SERVICE_ID', '')
+CDN_PURGE_API_TOKEN = os.getenv('CDN_PURGE_API_TOKEN', '')
+CDN_PURGE_SOFT = os.getenv('CDN_PURGE_SOFT', 'True') == 'True'
+CDN_PURGE_TIMEOUT = float(os.getenv('CDN_PURGE_TIMEOUT', '10'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
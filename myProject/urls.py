@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import path, include
@@ -10,4 +12,7 @@ urlpatterns = [
     path('dashboard/', include('dashboard.urls')),
     path('preview/home/', views.home_preview, name='home_preview'),
     path('', views.home, name='home'),
-]
\ No newline at end of file
+]
+
+# Locally stored media (LocalStorageBackend) - served by Django in development only
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)